@@ -0,0 +1,106 @@
+"""Measures event throughput over the Redis channels backend as API workers are added.
+
+Each simulated worker subscribes to the "events" channel the way EventDispatcher
+does, publishes its share of resource.update events, and decodes every event it
+receives. Requires the Redis server from config.toml.
+
+Run from the repository root (next to config.toml):
+    python -m benchmarks.channels_throughput [max_workers] [events] [pubsub|stream]
+"""
+
+import asyncio
+import json
+import multiprocessing
+import sys
+from datetime import UTC, datetime
+from time import perf_counter
+from uuid import uuid4
+from raven_api import REDIS
+from raven_api.common.models.config import StorageChannelsConfig
+from raven_api.util import make_channels_backend, DispatchedEvent
+from raven_api.common.plugin import EVENTS
+
+
+def make_event(index: int) -> bytes:
+    return json.dumps(
+        {
+            "id": uuid4().hex,
+            "path": "resource.update",
+            "source": "benchmark:events",
+            "scope": "global",
+            "emitted": datetime.now(UTC).isoformat(),
+            "entity_id": f"sensor.benchmark_{index}",
+        }
+    ).encode()
+
+
+async def run_worker(
+    index: int, workers: int, total: int, backend_name: str, barrier
+) -> float:
+    backend = make_channels_backend(
+        StorageChannelsConfig(
+            backend=backend_name, key_prefix=f"raven:benchmark:{workers}"
+        ),
+        REDIS,
+    )
+    await backend.on_startup()
+    await backend.subscribe(["events"])
+    await asyncio.to_thread(barrier.wait)
+
+    started = perf_counter()
+    received = 0
+
+    async def consume():
+        nonlocal received
+        async for _, message in backend.stream_events():
+            event = EVENTS(json.loads(message))
+            DispatchedEvent(event).frame(["resource"])
+            received += 1
+            if received >= total:
+                return
+
+    consumer = asyncio.create_task(consume())
+    for i in range(index, total, workers):
+        await backend.publish(make_event(i), ["events"])
+    await consumer
+
+    elapsed = perf_counter() - started
+    await backend.unsubscribe(["events"])
+    await backend.on_shutdown()
+    return elapsed
+
+
+def worker_main(index, workers, total, backend_name, barrier, results):
+    results.put(asyncio.run(run_worker(index, workers, total, backend_name, barrier)))
+
+
+def measure(workers: int, total: int, backend_name: str) -> float:
+    barrier = multiprocessing.Barrier(workers)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker_main,
+            args=(i, workers, total, backend_name, barrier, results),
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    elapsed = max(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return elapsed
+
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    backend_name = "redis_" + (sys.argv[3] if len(sys.argv) > 3 else "pubsub")
+
+    print(f"{backend_name}, {total} events per run")
+    print("workers  events/s  deliveries/s")
+    for workers in range(1, max_workers + 1):
+        elapsed = measure(workers, total, backend_name)
+        print(
+            f"{workers:>7}  {total / elapsed:>8.0f}  {total * workers / elapsed:>12.0f}"
+        )
@@ -0,0 +1,66 @@
+"""Compares JSON and MessagePack websocket frames for FrontendEvent payloads.
+
+Run from the repository root (next to config.toml): python -m benchmarks.event_encoding
+"""
+
+import json
+from datetime import UTC, datetime
+from timeit import timeit
+from uuid import uuid4
+from msgspec import msgpack
+from raven_api.common.plugin import ResourceUpdateEvent
+from raven_api.util import DispatchedEvent
+
+ROUNDS = 20000
+
+
+def make_frames() -> list[DispatchedEvent]:
+    return [
+        DispatchedEvent(
+            ResourceUpdateEvent(
+                id=uuid4().hex,
+                source="hass:events",
+                emitted=datetime.now(UTC),
+                entity_id=f"sensor.living_room_temperature_{i}",
+            )
+        )
+        for i in range(10)
+    ]
+
+
+if __name__ == "__main__":
+    events = make_frames()
+    subscribers = ["resource.update", "resource"]
+    json_frames = [e.frame(subscribers) for e in events]
+    msgpack_frames = [e.frame(subscribers, "msgpack") for e in events]
+    payloads = [json.loads(f) for f in json_frames]
+
+    def encode_json():
+        for payload in payloads:
+            json.dumps(payload)
+
+    def encode_msgpack():
+        for payload in payloads:
+            msgpack.encode(payload)
+
+    def decode_json():
+        for frame in json_frames:
+            json.loads(frame)
+
+    def decode_msgpack():
+        for frame in msgpack_frames:
+            msgpack.decode(frame)
+
+    json_size = sum(len(f.encode()) for f in json_frames) / len(json_frames)
+    msgpack_size = sum(len(f) for f in msgpack_frames) / len(msgpack_frames)
+    print(f"average frame: json {json_size:.0f}B, msgpack {msgpack_size:.0f}B")
+
+    count = ROUNDS * len(payloads)
+    for name, func in [
+        ("encode json", encode_json),
+        ("encode msgpack", encode_msgpack),
+        ("decode json", decode_json),
+        ("decode msgpack", decode_msgpack),
+    ]:
+        elapsed = timeit(func, number=ROUNDS)
+        print(f"{name:<15} {count / elapsed:>10.0f} frames/s")
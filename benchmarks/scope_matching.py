@@ -0,0 +1,60 @@
+"""Compares glob_match against the compiled ScopeMatcher on a guard-like workload.
+
+Run from the repository root (next to config.toml): python -m benchmarks.scope_matching
+"""
+
+from timeit import timeit
+from raven_api.common.models.auth import glob_match
+from raven_api.common.models.scope_matcher import ScopeMatcher, compile_scopes
+
+SCOPES = [
+    "admin.users.view.basic",
+    "admin.users.view.groups",
+    "admin.groups.view.basic",
+    "pipelines.view",
+    "pipelines.io.view",
+    *[f"resources.plugin.plugin_{i}.view" for i in range(40)],
+]
+
+CHECKS = [
+    "resources.*",
+    "resources.all.*",
+    *[f"resources.plugin.plugin_{i}.*" for i in range(0, 80, 2)],
+    "pipelines.io*",
+    "admin.*.manage",
+    "admin.users.*",
+]
+
+ROUNDS = 2000
+
+
+def run_glob():
+    for check in CHECKS:
+        bool(glob_match(check, SCOPES))
+
+
+def run_compiled_cached():
+    matcher = compile_scopes("benchmark", SCOPES)
+    for check in CHECKS:
+        matcher.matches(check)
+
+
+def run_compiled_fresh():
+    matcher = ScopeMatcher(SCOPES)
+    for check in CHECKS:
+        matcher.matches(check)
+
+
+if __name__ == "__main__":
+    for check in CHECKS:
+        assert ScopeMatcher(SCOPES).match(check) == glob_match(check, SCOPES)
+
+    baseline = timeit(run_glob, number=ROUNDS)
+    print(f"{len(SCOPES)} scopes x {len(CHECKS)} checks, {ROUNDS} rounds")
+    print(f"glob_match:              {baseline:.3f}s")
+    for name, func in [
+        ("ScopeMatcher (cached):", run_compiled_cached),
+        ("ScopeMatcher (rebuilt):", run_compiled_fresh),
+    ]:
+        elapsed = timeit(func, number=ROUNDS)
+        print(f"{name:<24} {elapsed:.3f}s ({baseline / elapsed:.1f}x)")
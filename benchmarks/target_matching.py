@@ -0,0 +1,155 @@
+"""Compares the compiled Executor.targets predicates against the previous interpreted
+matcher, checking every executor against every resource.
+
+The interpreted matcher dumps the resource for every target check, so it is timed on
+a sample of the resources and scaled up to the full set.
+
+Run from the repository root (next to config.toml):
+    python -m benchmarks.target_matching [resources] [executors] [sample]
+"""
+
+import random
+import sys
+from time import perf_counter
+from raven_api.common.plugin import (
+    ExecutionTarget,
+    Executor,
+    Resource,
+    ResourceMetadata,
+    ResourceProperty,
+)
+from raven_api.common.plugin.models.executor import match_fragment
+
+CATEGORIES = ["light", "switch", "sensor", "climate", "media_player", None]
+TAGS = [f"room_{i}" for i in range(20)] + ["dimmable", "color", "battery", "outdoor"]
+
+
+def interpreted_matches(target: ExecutionTarget, resource: Resource) -> bool:
+    """The pre-compilation ExecutionTarget.matches."""
+    resource_dict = resource.model_dump()
+    result = True
+    if target.categories:
+        if resource.metadata.category == None:
+            result = False
+        elif type(target.categories) == str:
+            result = target.categories == resource.metadata.category
+        else:
+            result = resource.metadata.category in target.categories
+    if result and target.tags:
+        if type(target.tags) == str:
+            result = target.tags in resource.metadata.tags
+        else:
+            result = any(
+                [
+                    (
+                        all([j in resource.metadata.tags for j in i])
+                        if type(i) == list
+                        else i in resource.metadata.tags
+                    )
+                    for i in target.tags
+                ]
+            )
+    if result and target.id:
+        if type(target.id) == str:
+            result = target.id == resource.id
+        else:
+            result = resource.id in target.id
+    if result and target.fragment:
+        result = match_fragment(target.fragment, resource_dict)
+    return not result if target.exclude else result
+
+
+def interpreted_executor_matches(executor: Executor, resource: Resource) -> bool:
+    if executor.targets == None:
+        return True
+    return all(
+        [
+            (
+                interpreted_matches(target, resource)
+                if isinstance(target, ExecutionTarget)
+                else any([interpreted_matches(i, resource) for i in target])
+            )
+            for target in executor.targets
+        ]
+    )
+
+
+def make_resource(rng: random.Random, index: int) -> Resource:
+    return Resource(
+        id=f"entity.benchmark_{index}",
+        plugin="benchmark",
+        state_key=f"entity.benchmark_{index}",
+        metadata=ResourceMetadata(
+            category=rng.choice(CATEGORIES), tags=rng.sample(TAGS, rng.randint(0, 4))
+        ),
+        properties={
+            "state": ResourceProperty(type="text", value=rng.choice(["on", "off"])),
+            "level": ResourceProperty(type="number", value=rng.randint(0, 255)),
+        },
+    )
+
+
+def make_target(rng: random.Random) -> ExecutionTarget:
+    target = {"exclude": rng.random() < 0.1}
+    if rng.random() < 0.7:
+        target["categories"] = rng.choice(
+            [rng.choice(CATEGORIES[:-1]), rng.sample(CATEGORIES[:-1], 2)]
+        )
+    if rng.random() < 0.5:
+        target["tags"] = rng.choice(
+            [rng.choice(TAGS), [rng.choice(TAGS), rng.sample(TAGS, 2)]]
+        )
+    if rng.random() < 0.05:
+        target["fragment"] = {"plugin": "benchmark"}
+    return ExecutionTarget(**target)
+
+
+def make_executor(rng: random.Random, index: int) -> Executor:
+    return Executor(
+        id=f"service_{index}",
+        plugin="benchmark",
+        export="services",
+        name=f"Service {index}",
+        targets=[
+            (
+                make_target(rng)
+                if rng.random() < 0.7
+                else [make_target(rng) for _ in range(rng.randint(1, 3))]
+            )
+            for _ in range(rng.randint(1, 2))
+        ],
+    )
+
+
+if __name__ == "__main__":
+    resource_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    executor_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    sample = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+
+    rng = random.Random(0)
+    resources = [make_resource(rng, i) for i in range(resource_count)]
+    executors = [make_executor(rng, i) for i in range(executor_count)]
+
+    for executor in executors:
+        for resource in resources[:sample]:
+            assert executor.matches_resources(
+                resource
+            ) == interpreted_executor_matches(executor, resource)
+
+    started = perf_counter()
+    for executor in executors:
+        for resource in resources[:sample]:
+            interpreted_executor_matches(executor, resource)
+    interpreted = (perf_counter() - started) * resource_count / sample
+
+    started = perf_counter()
+    matched = 0
+    for executor in executors:
+        for resource in resources:
+            if executor.matches_resources(resource):
+                matched += 1
+    compiled = perf_counter() - started
+
+    print(f"{resource_count} resources x {executor_count} executors, {matched} matches")
+    print(f"interpreted: {interpreted:.3f}s (scaled from {sample} resources)")
+    print(f"compiled:    {compiled:.3f}s ({interpreted / compiled:.1f}x)")
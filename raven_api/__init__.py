@@ -1,16 +1,16 @@
 import asyncio
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 import logging
 import tomllib
 from traceback import format_exc
 from typing import AsyncGenerator, Coroutine
 from litestar import Litestar, MediaType, Request, Response
 from litestar.status_codes import HTTP_500_INTERNAL_SERVER_ERROR
-from .common.models import Config, DOCUMENT_MODELS, User
+from .common.models import Config, DOCUMENT_MODELS, User, HASHER, USER_CACHE
 from .util import *
+from .common.plugin import EVENTS
 from redis.asyncio import Redis
 from litestar.channels import ChannelsPlugin
-from litestar.channels.backends.memory import MemoryChannelsBackend
 from litestar.di import Provide
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -21,10 +21,16 @@ from .controllers import API_ROUTER
 sys.path.append("./raven_api")
 
 
-with open("./config.toml", "rb") as config_file:
-    CONFIG = Config(**tomllib.load(config_file))
+with STARTUP.phase("config"):
+    with open("./config.toml", "rb") as config_file:
+        CONFIG = Config(**tomllib.load(config_file))
 
-REDIS = Redis(host=CONFIG.storage.redis.url)
+# Older configs give a bare hostname rather than a redis:// URL
+REDIS = Redis.from_url(
+    CONFIG.storage.redis.url
+    if "://" in CONFIG.storage.redis.url
+    else f"redis://{CONFIG.storage.redis.url}"
+)
 
 app_logs = LoggingConfig(
     root={"level": CONFIG.logging.level, "handlers": ["console"]},
@@ -35,13 +41,19 @@ app_logs = LoggingConfig(
 @asynccontextmanager
 async def app_lifecycle(app: Litestar) -> AsyncGenerator[None, None]:
     app.logger.info("Initializing lifecycle...")
-    plugins = PluginLoader(CONFIG, app.logger)
-    async with plugins.resolve_lifecycle() as lifecycle:
-        mongo_client = AsyncIOMotorClient(CONFIG.storage.mongo.url)
-        await init_beanie(
-            database=mongo_client.get_database(CONFIG.storage.mongo.database),
-            document_models=DOCUMENT_MODELS,
-        )
+    STARTUP.begin(CONFIG.startup)
+    plugins = await PluginLoader.load(CONFIG, app.logger)
+    USER_CACHE.ttl = CONFIG.auth.user_cache_ttl
+    async with AsyncExitStack() as stack:
+        stack.enter_context(HASHER.run(CONFIG.auth.hashing))
+        with STARTUP.phase("plugins.lifecycle"):
+            await stack.enter_async_context(plugins.resolve_lifecycle())
+        with STARTUP.phase("database"):
+            mongo_client = AsyncIOMotorClient(CONFIG.storage.mongo.url)
+            await init_beanie(
+                database=mongo_client.get_database(CONFIG.storage.mongo.database),
+                document_models=DOCUMENT_MODELS,
+            )
         context = Context(
             CONFIG,
             plugins,
@@ -49,22 +61,66 @@ async def app_lifecycle(app: Litestar) -> AsyncGenerator[None, None]:
             mongo_client.get_database(CONFIG.storage.mongo.database),
         )
 
-        if CONFIG.auth.admin.enabled:
-            existing = await User.from_username(CONFIG.auth.admin.username)
-            if existing:
-                if not existing.admin:
-                    raise RuntimeError("Non-admin user exists with admin credentials.")
-            else:
-                created = User.create(
-                    CONFIG.auth.admin.username, CONFIG.auth.admin.password
-                )
-                created.admin = True
-                created.scopes = []
-                await created.save()
+        with STARTUP.phase("admin"):
+            if CONFIG.auth.admin.enabled:
+                existing = await User.from_username(CONFIG.auth.admin.username)
+                if existing:
+                    if not existing.admin:
+                        raise RuntimeError(
+                            "Non-admin user exists with admin credentials."
+                        )
+                else:
+                    created = await User.create(
+                        CONFIG.auth.admin.username, CONFIG.auth.admin.password
+                    )
+                    created.admin = True
+                    created.scopes = []
+                    await created.save()
 
         app.state["context"] = context
-        async with plugins.event_listeners(app):
-            yield
+        with STARTUP.phase("services"):
+            app.state["sessions"] = await stack.enter_async_context(
+                SessionStore(REDIS, CONFIG.auth.sessions).run()
+            )
+            app.state["dispatcher"] = await stack.enter_async_context(
+                EventDispatcher(
+                    app.plugins.get(ChannelsPlugin),
+                    handlers=[plugins.handle_event, context.handle_event],
+                    history=CONFIG.events.replay_buffer,
+                ).run()
+            )
+            app.state["scheduler"] = await stack.enter_async_context(
+                ExecutionScheduler(
+                    plugins,
+                    CONFIG.jobs,
+                    REDIS if CONFIG.storage.channels.backend != "memory" else None,
+                ).run(app)
+            )
+            await stack.enter_async_context(
+                EventCoalescer(
+                    window=CONFIG.events.coalesce_window,
+                    paths=CONFIG.events.coalesce_paths,
+                    queue_size=CONFIG.events.queue_size,
+                ).run()
+            )
+        with STARTUP.phase("plugins.listeners"):
+            await stack.enter_async_context(
+                plugins.event_listeners(
+                    app,
+                    lease=(
+                        WorkerLease(
+                            REDIS,
+                            f"{CONFIG.storage.channels.key_prefix}:listeners",
+                            CONFIG.storage.channels.listener_lease_ttl,
+                            app.logger,
+                        )
+                        if CONFIG.storage.channels.backend != "memory"
+                        else None
+                    ),
+                )
+            )
+        STARTUP.finish(app.logger)
+        yield
 
 
 def plain_text_exception_handler(req: Request, exc: Exception) -> Response:
@@ -80,13 +136,16 @@ app = Litestar(
     lifespan=[app_lifecycle],
     plugins=[
         ChannelsPlugin(
-            MemoryChannelsBackend(),
+            make_channels_backend(CONFIG.storage.channels, REDIS),
             arbitrary_channels_allowed=True,
         )
     ],
     state=State({}),
     dependencies={
         "session": Provide(provide_session),
+        "sessions": Provide(provide_sessions),
+        "dispatcher": Provide(provide_dispatcher),
+        "scheduler": Provide(provide_scheduler),
         "context": Provide(provide_context),
         "config": Provide(provide_config),
         "lifecycle": Provide(provide_lifcycle),
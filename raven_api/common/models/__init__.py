@@ -1,6 +1,16 @@
 from .config import Config
-from .auth import Session, User, AuthState, RedactedUser, EventContext, glob_match
+from .auth import (
+    Session,
+    User,
+    AuthState,
+    RedactedUser,
+    EventContext,
+    glob_match,
+    USER_CACHE,
+)
 from .scope import Scope, CORE_SCOPE
+from .hashing import HASHER, PasswordHasher
+from .scope_matcher import ScopeMatcher, compile_scopes
 from .pipelines import (
     PipelineDataIO,
     PipelineField,
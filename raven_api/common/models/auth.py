@@ -1,9 +1,21 @@
+from collections import OrderedDict
 from datetime import datetime, UTC
-from passlib.hash import argon2
-from beanie import ValidateOnSave, before_event, Delete
+from time import monotonic
+from beanie import (
+    ValidateOnSave,
+    before_event,
+    after_event,
+    Delete,
+    Save,
+    Replace,
+    SaveChanges,
+    Update,
+)
 from pydantic import BaseModel
 from .base import BaseObject
 from .scope import Scope, DEFAULT_SCOPES
+from .hashing import HASHER
+from .scope_matcher import ScopeMatcher, compile_scopes
 
 
 def glob_match(check: str, matches: list[str]) -> list[str]:
@@ -37,6 +49,36 @@ class RedactedUser(BaseModel):
     scopes: list[str]
 
 
+class UserCache:
+    """Short-lived cross-request cache of User documents, keyed by id."""
+
+    def __init__(self, ttl: float = 5.0, size: int = 1024):
+        self.ttl = ttl
+        self.size = size
+        self._users: OrderedDict[str, tuple[float, "User"]] = OrderedDict()
+
+    async def get(self, id: str) -> "User | None":
+        cached = self._users.get(id, None)
+        if cached and monotonic() - cached[0] < self.ttl:
+            return cached[1]
+
+        user = await User.get(id)
+        if user and self.ttl > 0:
+            self._users[id] = (monotonic(), user)
+            self._users.move_to_end(id)
+            while len(self._users) > self.size:
+                self._users.popitem(last=False)
+        else:
+            self._users.pop(id, None)
+        return user
+
+    def discard(self, id: str) -> None:
+        self._users.pop(id, None)
+
+
+USER_CACHE = UserCache()
+
+
 class EventContext(BaseObject):
     session_id: str
     subscriptions: list[str] = []
@@ -66,7 +108,7 @@ class Session(BaseObject):
 
     async def user(self) -> "User | None":
         if self.user_id:
-            return await User.get(self.user_id)
+            return await USER_CACHE.get(self.user_id)
         return None
 
     async def get_authstate(self) -> "AuthState":
@@ -92,20 +134,30 @@ class User(BaseObject):
         name = "auth.user"
 
     @classmethod
-    def create(cls, username: str, password: str) -> "User":
+    async def create(cls, username: str, password: str) -> "User":
         return User(
-            username=username, password=argon2.hash(password), scopes=DEFAULT_SCOPES
+            username=username,
+            password=await HASHER.hash(password),
+            scopes=DEFAULT_SCOPES,
         )
 
     @classmethod
     async def from_username(cls, username: str) -> "User | None":
         return await cls.find_one(User.username == username)
 
+    @after_event(Save, Replace, SaveChanges, Update, Delete)
+    def uncache(self):
+        USER_CACHE.discard(self.id)
+
     async def sessions(self) -> list[Session]:
         return await Session.find(Session.user_id == self.id).to_list()
 
-    def verify(self, password: str) -> bool:
-        return argon2.verify(password, self.password)
+    async def verify(self, password: str) -> bool:
+        valid, outdated = await HASHER.verify(password, self.password)
+        if valid and outdated:
+            self.password = await HASHER.hash(password)
+            await self.save()
+        return valid
 
     @property
     def redacted(self) -> RedactedUser:
@@ -113,23 +165,28 @@ class User(BaseObject):
             id=self.id, username=self.username, admin=self.admin, scopes=self.scopes
         )
 
+    @property
+    def compiled_scopes(self) -> ScopeMatcher:
+        return compile_scopes(self.id, self.scopes)
+
     def check_scope(self, *scopes: Scope | str) -> dict[str, bool]:
         scope_paths = [i.path if isinstance(i, Scope) else i for i in scopes]
         if self.admin:
             return {path: True for path in scope_paths}
 
-        result = {}
-        for check in scope_paths:
-            result[check] = glob_match(check, self.scopes)
-
-        return result
+        matcher = self.compiled_scopes
+        return {check: matcher.match(check) for check in scope_paths}
 
     def has_scope(self, *scopes: Scope | str, match_all: bool = False) -> bool:
-        matched = self.check_scope(*scopes)
+        if self.admin:
+            return True
+
+        matcher = self.compiled_scopes
+        scope_paths = [i.path if isinstance(i, Scope) else i for i in scopes]
         if match_all:
-            return all(matched.values())
+            return all(matcher.matches(check) for check in scope_paths)
         else:
-            return any(matched.values())
+            return any(matcher.matches(check) for check in scope_paths)
 
 
 class AuthState(BaseModel):
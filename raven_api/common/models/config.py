@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from enum import StrEnum
+from typing import Literal
 
 
 class LogLevel(StrEnum):
@@ -22,9 +23,18 @@ class StorageRedisConfig(BaseModel):
     url: str
 
 
+class StorageChannelsConfig(BaseModel):
+    backend: Literal["memory", "redis_pubsub", "redis_stream"] = "memory"
+    key_prefix: str = "raven:channels"
+    history: int = 100
+    stream_ttl: int = 60
+    listener_lease_ttl: float = 15.0
+
+
 class StorageConfig(BaseModel):
     mongo: StorageMongoConfig
     redis: StorageRedisConfig
+    channels: StorageChannelsConfig = StorageChannelsConfig()
 
 
 class LoggingConfig(BaseModel):
@@ -38,12 +48,86 @@ class AuthAdminConfig(BaseModel):
     password: str | None = None
 
 
+class SessionStoreConfig(BaseModel):
+    cache_size: int = 1024
+    local_ttl: float = 5.0
+    flush_interval: float = 10.0
+    redis_ttl: int = 86400
+    redis_prefix: str = "raven:session:"
+
+
+class HashingConfig(BaseModel):
+    workers: int = 2
+    max_concurrent: int = 4
+    time_cost: int | None = None
+    memory_cost: int | None = None
+    parallelism: int | None = None
+
+
 class AuthConfig(BaseModel):
     admin: AuthAdminConfig | None = None
+    sessions: SessionStoreConfig = SessionStoreConfig()
+    hashing: HashingConfig = HashingConfig()
+    user_cache_ttl: float = 5.0
+
+
+class ResourceCacheConfig(BaseModel):
+    enabled: bool = True
+    max_age: float | None = 60.0
+    recent_size: int = 1000
+
+
+class ExecutorCacheConfig(BaseModel):
+    enabled: bool = True
+    ttl: float | None = 30.0
+    max_entries: int = 512
+
+
+class CacheConfig(BaseModel):
+    resources: ResourceCacheConfig = ResourceCacheConfig()
+    executors: ExecutorCacheConfig = ExecutorCacheConfig()
+
+
+class PluginCallLimits(BaseModel):
+    timeout: float | None = None
+    max_concurrent: int | None = None
+
+
+class PluginCallsConfig(BaseModel):
+    timeout: float | None = 10.0
+    max_concurrent: int | None = None
+    breaker_threshold: int = 3
+    breaker_cooldown: float = 30.0
+    bulk_concurrency: int = 8
+    bulk_max_calls: int = 1000
+    exports: dict[str, PluginCallLimits] = {}
+
+
+class ExecutionQueueConfig(BaseModel):
+    workers: int = 4
+    plugin_workers: dict[str, int] = {}
+    critical_workers: int = 1
+    max_depth: int = 1000
+    history: int = 1000
+    key_prefix: str = "raven:jobs"
+    job_ttl: int = 3600
+
+
+class EventsConfig(BaseModel):
+    coalesce_window: float = 0.1
+    coalesce_paths: list[str] = ["resource.update"]
+    queue_size: int = 1000
+    replay_buffer: int = 500
+
+
+class StartupConfig(BaseModel):
+    trace_allocations: bool = False
 
 
 class DevConfig(BaseModel):
     plugin_dep_install: bool = True
+    plugin_dep_fingerprints: str | None = None
+    plugin_lazy_import: bool = False
 
 
 class Config(BaseModel):
@@ -52,3 +136,8 @@ class Config(BaseModel):
     logging: LoggingConfig = LoggingConfig()
     auth: AuthConfig = AuthConfig()
     dev: DevConfig = DevConfig()
+    cache: CacheConfig = CacheConfig()
+    events: EventsConfig = EventsConfig()
+    calls: PluginCallsConfig = PluginCallsConfig()
+    jobs: ExecutionQueueConfig = ExecutionQueueConfig()
+    startup: StartupConfig = StartupConfig()
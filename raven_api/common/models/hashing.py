@@ -0,0 +1,103 @@
+from asyncio import Semaphore, get_running_loop
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+from time import perf_counter
+from typing import Any, Callable
+from passlib.hash import argon2
+from .config import HashingConfig
+
+
+def _hash_password(settings: dict[str, int], password: str) -> str:
+    return argon2.using(**settings).hash(password)
+
+
+def _verify_password(
+    settings: dict[str, int], password: str, hashed: str
+) -> tuple[bool, bool]:
+    handler = argon2.using(**settings)
+    if handler.verify(password, hashed):
+        return True, handler.needs_update(hashed)
+    return False, False
+
+
+class PasswordHasher:
+    """Runs argon2 in a spawned process pool so logins don't block the event loop."""
+
+    def __init__(self):
+        self.config = HashingConfig()
+        self._executor: Executor | None = None
+        self._limit: Semaphore | None = None
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.wait_time = 0.0
+
+    @property
+    def settings(self) -> dict[str, int]:
+        return {
+            k: v
+            for k, v in self.config.model_dump(
+                include={"time_cost", "memory_cost", "parallelism"}
+            ).items()
+            if v != None
+        }
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "queued": self.queued,
+            "active": self.active,
+            "completed": self.completed,
+            "average_wait": (
+                self.wait_time / self.completed if self.completed > 0 else 0.0
+            ),
+        }
+
+    @contextmanager
+    def run(self, config: HashingConfig):
+        self.config = config
+        self._limit = Semaphore(max(config.max_concurrent, 1))
+        self._executor = (
+            ProcessPoolExecutor(
+                max_workers=config.workers, mp_context=get_context("spawn")
+            )
+            if config.workers > 0
+            else None
+        )
+        try:
+            yield self
+        finally:
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._limit == None:
+            self._limit = Semaphore(max(self.config.max_concurrent, 1))
+
+        queued_at = perf_counter()
+        self.queued += 1
+        try:
+            await self._limit.acquire()
+        finally:
+            self.queued -= 1
+
+        self.wait_time += perf_counter() - queued_at
+        self.active += 1
+        try:
+            return await get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._limit.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash_password, self.settings, password)
+
+    async def verify(self, password: str, hashed: str) -> tuple[bool, bool]:
+        """Returns whether the password matched and whether the hash needs rehashing."""
+        return await self._submit(_verify_password, self.settings, password, hashed)
+
+
+HASHER = PasswordHasher()
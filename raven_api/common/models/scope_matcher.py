@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+
+class ScopeNode:
+    def __init__(self):
+        self.children: dict[str, "ScopeNode"] = {}
+        self.terminal: list[tuple[int, str]] = []
+        self.subtree: list[tuple[int, str]] = []
+
+
+class ScopeMatcher:
+    """A trie over a fixed list of granted scopes, equivalent to `glob_match`."""
+
+    def __init__(self, scopes: list[str]):
+        self.scopes = list(scopes)
+        self.root = ScopeNode()
+        for index, scope in enumerate(self.scopes):
+            node = self.root
+            for part in scope.split("."):
+                node.subtree.append((index, scope))
+                if not part in node.children.keys():
+                    node.children[part] = ScopeNode()
+                node = node.children[part]
+            node.subtree.append((index, scope))
+            node.terminal.append((index, scope))
+
+    def _walk(self, node: ScopeNode, check: list[str], depth: int, first: bool):
+        if depth > 0:
+            yield from node.terminal
+            if first and len(node.terminal) > 0:
+                return
+
+        if depth < len(check):
+            if check[depth] == "*":
+                for child in node.children.values():
+                    yield from self._walk(child, check, depth + 1, first)
+            elif check[depth] in node.children.keys():
+                yield from self._walk(
+                    node.children[check[depth]], check, depth + 1, first
+                )
+        elif check[-1] == "*":
+            for child in node.children.values():
+                yield from child.subtree
+
+    def match(self, check: str) -> list[str]:
+        found = sorted(self._walk(self.root, check.split("."), 0, False))
+        return [scope for _, scope in found]
+
+    def matches(self, check: str) -> bool:
+        for _ in self._walk(self.root, check.split("."), 0, True):
+            return True
+        return False
+
+
+_COMPILED: OrderedDict[str, tuple[int, ScopeMatcher]] = OrderedDict()
+_COMPILED_MAX = 1024
+
+
+def compile_scopes(owner: str, scopes: list[str]) -> ScopeMatcher:
+    """Returns a cached ScopeMatcher for `owner`, rebuilt when its scope list changes."""
+    scope_hash = hash(tuple(scopes))
+    cached = _COMPILED.get(owner, None)
+    if cached and cached[0] == scope_hash:
+        _COMPILED.move_to_end(owner)
+        return cached[1]
+
+    matcher = ScopeMatcher(scopes)
+    _COMPILED[owner] = (scope_hash, matcher)
+    _COMPILED.move_to_end(owner)
+    while len(_COMPILED) > _COMPILED_MAX:
+        _COMPILED.popitem(last=False)
+    return matcher
@@ -20,6 +20,8 @@ from .executor import (
     ExecArguments,
     ExecArgument,
     ExecutionTarget,
+    CompiledTarget,
+    CompiledTargets,
     Executor,
     BooleanArgument,
     StringArgument,
@@ -31,4 +33,12 @@ from .executor import (
     ExecutionManager,
     match_execution_targets,
 )
-from .event import EventRegistry, EVENTS, BaseEvent, ResourceUpdateEvent, EVENT_TYPES
+from .event import (
+    EventRegistry,
+    EVENTS,
+    BaseEvent,
+    ResourceUpdateEvent,
+    ExecutionCompleteEvent,
+    PluginReloadEvent,
+    EVENT_TYPES,
+)
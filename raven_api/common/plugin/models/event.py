@@ -1,9 +1,13 @@
 from datetime import UTC, datetime
 from traceback import print_exc
-from typing import Any, ClassVar, Literal, Type, TypeVar
+from typing import TYPE_CHECKING, Any, ClassVar, Literal, Type, TypeVar
 from uuid import uuid4
 from pydantic import BaseModel, computed_field
 from litestar import Litestar
+from .resource import ResourceMetadata, ResourceProperty
+
+if TYPE_CHECKING:
+    from ....util.event_coalescer import EventCoalescer
 
 TEvent = TypeVar("TEvent", bound="BaseEvent")
 
@@ -11,6 +15,7 @@ TEvent = TypeVar("TEvent", bound="BaseEvent")
 class EventRegistry:
     def __init__(self):
         self._events: dict[str, Type["BaseEvent"]] = {}
+        self.coalescer: "EventCoalescer | None" = None
 
     @property
     def events(self) -> dict[str, Type["BaseEvent"]]:
@@ -41,7 +46,10 @@ class EventRegistry:
                         scope=scopes,
                         **data
                     )
-                    app.emit(listener, event=event_obj, app=app)
+                    if self.coalescer:
+                        self.coalescer.submit(app, listener, event_obj)
+                    else:
+                        app.emit(listener, event=event_obj, app=app)
             except:
                 print_exc()
 
@@ -74,8 +82,14 @@ class BaseEvent(BaseModel):
 
 @EVENTS.register("resource.update")
 class ResourceUpdateEvent(BaseEvent):
+    """Emitted by plugins with only `entity_id` set; the core fills in the rest."""
+
     path: Literal["resource.update"] = "resource.update"
     entity_id: str
+    changes: dict[str, ResourceProperty | None] | None = None
+    metadata: ResourceMetadata | None = None
+    state_key: str | None = None
+    deleted: bool = False
 
 
 @EVENTS.register("pipeline.io.edit")
@@ -90,4 +104,32 @@ class PipelineIOActivateEvent(BaseEvent):
     io_id: str
 
 
-EVENT_TYPES = ResourceUpdateEvent | PipelineIOActivateEvent | PipelineIOUpdateEvent
+@EVENTS.register("execution.complete")
+class ExecutionCompleteEvent(BaseEvent):
+    """Emitted by the execution scheduler when a queued job finishes."""
+
+    path: Literal["execution.complete"] = "execution.complete"
+    job_id: str
+    plugin: str
+    executor: str
+    target: str
+    status: str
+    elapsed: float
+
+
+@EVENTS.register("plugin.reload")
+class PluginReloadEvent(BaseEvent):
+    """Tells the other API workers to reload a plugin."""
+
+    path: Literal["plugin.reload"] = "plugin.reload"
+    slug: str
+    worker: str
+
+
+EVENT_TYPES = (
+    ResourceUpdateEvent
+    | PipelineIOActivateEvent
+    | PipelineIOUpdateEvent
+    | ExecutionCompleteEvent
+    | PluginReloadEvent
+)
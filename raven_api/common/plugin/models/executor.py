@@ -1,3 +1,4 @@
+from functools import cached_property
 from typing import Any, Literal
 from pydantic import BaseModel, computed_field
 from .resource import Resource
@@ -27,64 +28,127 @@ def match_fragment(fragment: dict, test: dict) -> bool:
     return is_match
 
 
-class ExecutionTarget(BaseModel):
-    exclude: bool = False
-    categories: str | list[str] | None = None
-    tags: list[str | list[str]] | str | None = None
-    id: str | list[str] | None = None
-    fragment: dict | None = None
+def _plain(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if type(value) == dict:
+        return {k: _plain(v) for k, v in value.items()}
+    if type(value) == list:
+        return [_plain(i) for i in value]
+    return value
+
+
+class CompiledTarget:
+    """An ExecutionTarget with its fields pre-interpreted into sets."""
+
+    def __init__(self, target: "ExecutionTarget"):
+        self.exclude = target.exclude
+        self.categories: frozenset[str] | None = None
+        self.tags: list[frozenset[str]] | None = None
+        self.ids: frozenset[str] | None = None
+        self.fragment: list[tuple[str, Any]] | None = None
+
+        if target.categories:
+            self.categories = frozenset(
+                [target.categories]
+                if type(target.categories) == str
+                else target.categories
+            )
+        if target.tags:
+            self.tags = [
+                frozenset(option if type(option) == list else [option])
+                for option in (
+                    [target.tags] if type(target.tags) == str else target.tags
+                )
+            ]
+        if target.id:
+            self.ids = frozenset([target.id] if type(target.id) == str else target.id)
+        if target.fragment:
+            self.fragment = list(target.fragment.items())
 
     def matches(self, target: Resource, match_none=False) -> bool:
-        result = self._matches(target, match_none=match_none)
-        if self.exclude:
-            return not result
-        return result
+        return self._matches(target, match_none=match_none) != self.exclude
+
+    def match_fragment(self, target: Resource) -> bool:
+        if self.fragment == None:
+            return True
+        for key, expected in self.fragment:
+            if not key in Resource.model_fields.keys():
+                return False
+            actual = _plain(getattr(target, key))
+            if type(expected) != type(actual):
+                return False
+            if type(expected) == dict and not match_fragment(expected, actual):
+                return False
+            if expected != actual:
+                return False
+        return True
 
     def _matches(self, target: Resource, match_none=False) -> bool:
-        target_dict = target.model_dump()
-        if self.categories:
-            if target.metadata.category == None:
+        metadata = target.metadata
+        if self.categories != None:
+            if metadata.category == None:
                 if not match_none:
                     return False
-            else:
-                if type(self.categories) == str:
-                    if self.categories != target.metadata.category:
-                        return False
-                else:
-                    if not target.metadata.category in self.categories:
-                        return False
-
-        if self.tags:
-            if type(self.tags) == str:
-                if not self.tags in target.metadata.tags:
-                    return False
-            else:
-                if not any(
-                    [
-                        (
-                            all([j in target.metadata.tags for j in i])
-                            if type(i) == list
-                            else i in target.metadata.tags
-                        )
-                        for i in self.tags
-                    ]
-                ):
-                    return False
+            elif not metadata.category in self.categories:
+                return False
 
-        if self.id:
-            if type(self.id) == str:
-                if self.id != target.id:
-                    return False
+        if self.tags != None:
+            for option in self.tags:
+                if option.issubset(metadata.tags):
+                    break
             else:
-                if not target.id in self.id:
-                    return False
-
-        if self.fragment:
-            if not match_fragment(self.fragment, target_dict):
                 return False
 
+        if self.ids != None and not target.id in self.ids:
+            return False
+
+        return self.fragment == None or self.match_fragment(target)
+
+
+class CompiledTargets:
+    """Every entry must match; an entry is a target or a list of alternatives."""
+
+    def __init__(self, targets: list["ExecutionTarget | list[ExecutionTarget]"]):
+        self.groups: list[list[CompiledTarget]] = [
+            (
+                [target.compiled]
+                if isinstance(target, ExecutionTarget)
+                else [i.compiled for i in target]
+            )
+            for target in targets
+        ]
+
+    def matches(self, resource: Resource) -> bool:
+        for group in self.groups:
+            for target in group:
+                if target._matches(resource) != target.exclude:
+                    break
+            else:
+                return False
         return True
 
+    def matches_any(self, resources: list[Resource]) -> bool:
+        for resource in resources:
+            if self.matches(resource):
+                return True
+        return False
+
+
+class ExecutionTarget(BaseModel):
+    exclude: bool = False
+    categories: str | list[str] | None = None
+    tags: list[str | list[str]] | str | None = None
+    id: str | list[str] | None = None
+    fragment: dict | None = None
+
+    @cached_property
+    def compiled(self) -> CompiledTarget:
+        return CompiledTarget(self)
+
+    def matches(self, target: Resource, match_none=False) -> bool:
+        return self.compiled.matches(target, match_none=match_none)
+
 
 class ExecArgument(BaseModel):
     type: None
@@ -192,19 +256,7 @@ ExecArguments = (
 def match_execution_targets(
     targets: list[ExecutionTarget | list[ExecutionTarget]], resources: list[Resource]
 ) -> bool:
-    for resource in resources:
-        if all(
-            [
-                (
-                    target.matches(resource)
-                    if isinstance(target, ExecutionTarget)
-                    else any([candidate.matches(resource) for candidate in target])
-                )
-                for target in targets
-            ]
-        ):
-            return True
-    return False
+    return CompiledTargets(targets).matches_any(resources)
 
 
 class Executor(BaseModel):
@@ -216,10 +268,17 @@ class Executor(BaseModel):
     targets: list[ExecutionTarget | list[ExecutionTarget]] | None = None
     arguments: dict[str, ExecArguments] = {}
 
-    def matches_resources(self, *resources: Resource) -> bool:
+    @cached_property
+    def compiled_targets(self) -> CompiledTargets | None:
         if self.targets == None:
+            return None
+        return CompiledTargets(self.targets)
+
+    def matches_resources(self, *resources: Resource) -> bool:
+        compiled = self.compiled_targets
+        if compiled == None:
             return True
-        return match_execution_targets(self.targets, resources)
+        return compiled.matches_any(resources)
 
 
 class ExecutionManager:
@@ -11,5 +11,9 @@ class LifecycleContext:
 
         self.context[(plugin, key)] = value
 
+    def remove(self, plugin: str):
+        for key in [i for i in self.context.keys() if i[0] == plugin]:
+            del self.context[key]
+
     def get[T](self, plugin: str, key: str, value_type: T = Any) -> T | None:
         return self.context.get((plugin, key), None)
@@ -42,11 +42,22 @@ class LifecycleExport(BaseExport):
     type: Literal["lifecycle"]
     context_key: str
     is_async: bool = False
+    kwargs: dict[str, str] = {}
+
+    def requires(self, plugin: str) -> dict[str, tuple[str, str]]:
+        """Maps each kwarg to the (plugin, context key) it is filled from."""
+        return {
+            k: tuple(v.split(".", 1)) if "." in v else (plugin, v)
+            for k, v in self.kwargs.items()
+        }
 
 
 class ResourceExport(BaseExport):
     type: Literal["resource"]
     kwargs: dict[str, str | Literal["config"]] = {}
+    persistent: bool = False
+    timeout: float | None = None
+    max_concurrent: int | None = None
 
     def resolve(self, base: ModuleType) -> ResourceResolver:
         return super().resolve(base)
@@ -55,6 +66,9 @@ class ResourceExport(BaseExport):
 class ExecutorExport(BaseExport):
     type: Literal["executor"]
     kwargs: dict[str, str | Literal["config"]] = {}
+    persistent: bool = False
+    timeout: float | None = None
+    max_concurrent: int | None = None
 
     def resolve(self, base: ModuleType) -> ExecutionManager:
         return super().resolve(base)
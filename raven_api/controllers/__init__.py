@@ -1,5 +1,7 @@
 from litestar import Router, get
-from ..common.models import Session, AuthState
+from litestar.exceptions import NotFoundException
+from ..common.models import Session, AuthState, HASHER
+from ..util import STARTUP, StartupReport, guard_scoped
 from .auth import AuthController, AuthScopesController
 from .plugins import PluginsController
 from .resources import ResourceController
@@ -15,9 +17,24 @@ CONTROLLERS = [
     PipelineIOController,
 ]
 
+
 @get("/")
 async def get_root(session: Session) -> AuthState:
     return await session.get_authstate()
 
 
-API_ROUTER = Router(path="/api", route_handlers=[*CONTROLLERS, get_root])
+@get("/startup", guards=[guard_scoped("admin.plugins.manage")])
+async def get_startup() -> StartupReport:
+    if STARTUP.report == None:
+        raise NotFoundException("Startup has not finished")
+    return STARTUP.report
+
+
+@get("/hashing", guards=[guard_scoped("admin.plugins.manage")])
+async def get_hashing_stats() -> dict[str, int | float]:
+    return HASHER.stats
+
+
+API_ROUTER = Router(
+    path="/api", route_handlers=[*CONTROLLERS, get_root, get_startup, get_hashing_stats]
+)
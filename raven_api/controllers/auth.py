@@ -2,7 +2,13 @@ from traceback import print_exc
 from litestar import Controller, get, post
 from pydantic import BaseModel
 from ..common.models import Session, User, RedactedUser, Config, Scope
-from ..util import guard_logged_in, provide_user, Context, provide_user_scopes
+from ..util import (
+    guard_logged_in,
+    provide_user,
+    Context,
+    provide_user_scopes,
+    SessionStore,
+)
 from litestar.exceptions import NotFoundException, MethodNotAllowedException
 from litestar.di import Provide
 
@@ -17,37 +23,43 @@ class AuthController(Controller):
 
     @post("/login")
     async def login(
-        self, session: Session, data: UserSpecModel, config: Config
+        self,
+        session: Session,
+        sessions: SessionStore,
+        data: UserSpecModel,
+        config: Config,
     ) -> RedactedUser:
         user = await User.from_username(data.username)
         if not user:
             raise NotFoundException("Unknown username/password")
-        if not user.verify(data.password):
+        if not await user.verify(data.password):
             raise NotFoundException("Unknown username/password")
 
         if user.admin and not config.auth.admin.enabled:
             raise NotFoundException("Unknown username/password")
 
         session.user_id = user.id
-        await session.save()
+        await sessions.save(session)
         return user.redacted
 
     @post("/create")
-    async def create_user(self, session: Session, data: UserSpecModel) -> RedactedUser:
+    async def create_user(
+        self, session: Session, sessions: SessionStore, data: UserSpecModel
+    ) -> RedactedUser:
         user = await User.from_username(data.username)
         if user:
             raise MethodNotAllowedException("User already exists.")
 
-        new_user = User.create(data.username, data.password)
+        new_user = await User.create(data.username, data.password)
         await new_user.save()
         session.user_id = new_user.id
-        await session.save()
+        await sessions.save(session)
         return new_user.redacted
 
     @post("/logout", guards=[guard_logged_in])
-    async def logout(self, session: Session) -> None:
+    async def logout(self, session: Session, sessions: SessionStore) -> None:
         session.user_id = None
-        await session.save()
+        await sessions.save(session)
 
 
 class AuthScopesController(Controller):
@@ -1,14 +1,23 @@
-from asyncio import TaskGroup, create_task
+from asyncio import Task, TaskGroup, create_task
 import asyncio
 import json
 from traceback import print_exc
 from typing import Any, Literal, Type, get_args
-from litestar import Controller, WebSocket, websocket
+from litestar import Controller, WebSocket, get, websocket
 from litestar.status_codes import *
-from litestar.channels import ChannelsPlugin
-from pydantic import BaseModel, computed_field
-from ..common.models import Session, glob_match
+from pydantic import BaseModel
+import msgspec
+from msgspec import msgpack
+from ..common.models import Session, User, EventContext, ScopeMatcher
 from ..common.plugin import EVENTS
+from ..util import (
+    SessionStore,
+    EventDispatcher,
+    DispatchedEvent,
+    EventEncoding,
+    guard_scoped,
+    make_resync_frame,
+)
 
 
 class AddSubscriptionsCommand(BaseModel):
@@ -24,23 +33,6 @@ class RemoveSubscriptionsCommand(BaseModel):
 COMMANDS = AddSubscriptionsCommand | RemoveSubscriptionsCommand
 
 
-class FrontendEvent(BaseModel):
-    id: str
-    source: str
-    type: str
-    channel: Literal["global", "session"]
-    data: Any
-    subscribers: list[str]
-
-    @computed_field
-    @property
-    def plugin(self) -> str | None:
-        if self.source == "core":
-            return None
-        else:
-            return self.source.split(":")[0]
-
-
 def command(obj: Any) -> COMMANDS | None:
     if isinstance(obj, dict) and "command" in obj.keys():
         constructors: dict[str, Type[COMMANDS]] = {
@@ -54,93 +46,204 @@ def command(obj: Any) -> COMMANDS | None:
     return None
 
 
+class EventConnection:
+    """Per-socket subscriptions, saved as the paths added or removed since."""
+
+    persist_delay = 2.0
+
+    def __init__(
+        self,
+        session: Session,
+        context: EventContext,
+        user: User | None,
+        encoding: EventEncoding = "json",
+    ):
+        self.session = session
+        self.encoding = encoding
+        self.context = context
+        self.user = user
+        self.subscriptions: list[str] = list(context.subscriptions)
+        self.matcher = ScopeMatcher(self.subscriptions)
+        self._added: set[str] = set()
+        self._removed: set[str] = set()
+        self._persist_task: Task | None = None
+
+    @classmethod
+    async def open(
+        cls, session: Session, encoding: EventEncoding = "json"
+    ) -> "EventConnection":
+        return cls(
+            session,
+            await session.get_event_context(),
+            await session.user(),
+            encoding=encoding,
+        )
+
+    def _changed(self) -> None:
+        self.matcher = ScopeMatcher(self.subscriptions)
+        if not self._persist_task or self._persist_task.done():
+            self._persist_task = create_task(self._persist_later())
+
+    async def _persist_later(self) -> None:
+        await asyncio.sleep(self.persist_delay)
+        try:
+            await self.persist()
+        except Exception:
+            print_exc()
+
+    async def persist(self) -> None:
+        added, removed = self._added, self._removed
+        self._added, self._removed = set(), set()
+        try:
+            context = EventContext.find(EventContext.id == self.context.id)
+            if len(removed) > 0:
+                await context.update(
+                    {"$pull": {"subscriptions": {"$in": list(removed)}}}
+                )
+            if len(added) > 0:
+                await context.update(
+                    {"$addToSet": {"subscriptions": {"$each": list(added)}}}
+                )
+        except:
+            self._added, self._removed = added | self._added, removed | self._removed
+            raise
+
+    async def close(self) -> None:
+        if self._persist_task and not self._persist_task.done():
+            self._persist_task.cancel()
+            try:
+                await self._persist_task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.persist()
+        except Exception:
+            print_exc()
+
+    def subscribe(self, paths: list[str]) -> None:
+        for path in paths:
+            if not path in self.subscriptions:
+                self.subscriptions.append(path)
+            self._added.add(path)
+            self._removed.discard(path)
+        self._changed()
+
+    def unsubscribe(self, paths: list[str]) -> None:
+        self.subscriptions = [i for i in self.subscriptions if not i in paths]
+        for path in paths:
+            self._removed.add(path)
+            self._added.discard(path)
+        self._changed()
+
+    async def route(self, event: DispatchedEvent) -> list[str]:
+        """Returns the subscriptions this event should be delivered under, if any."""
+        matches = self.matcher.match(event.path)
+        if len(matches) == 0 or event.is_global:
+            return matches
+
+        if self.session.user_id != (self.user.id if self.user else None):
+            self.user = await self.session.user()
+        if self.user and self.user.has_scope(*event.scope):
+            return matches
+        return []
+
+
 class EventController(Controller):
     path = "/events"
 
-    async def handle_commands(self, socket: WebSocket, session: Session):
-        async for message in socket.iter_json():
+    async def receive_commands(self, socket: WebSocket, connection: EventConnection):
+        if connection.encoding == "msgpack":
+            async for message in socket.iter_data(mode="binary"):
+                try:
+                    yield msgpack.decode(message)
+                except msgspec.DecodeError:
+                    pass
+        else:
+            async for message in socket.iter_json():
+                yield message
+
+    async def handle_commands(self, socket: WebSocket, connection: EventConnection):
+        async for message in self.receive_commands(socket, connection):
             obj = command(message)
             if obj:
-                context = await session.get_event_context()
                 match obj.command:
                     case "subscriptions.add":
-                        for path in obj.paths:
-                            if not path in context.subscriptions:
-                                context.subscriptions.append(path)
-                        await context.save()
+                        connection.subscribe(obj.paths)
                     case "subscriptions.remove":
-                        context.subscriptions = [
-                            i for i in context.subscriptions if not i in obj.paths
-                        ]
-                        await context.save()
+                        connection.unsubscribe(obj.paths)
+
+    async def send_event(
+        self, socket: WebSocket, connection: EventConnection, event: DispatchedEvent
+    ):
+        matches = await connection.route(event)
+        if len(matches) > 0:
+            if connection.encoding == "msgpack":
+                await socket.send_bytes(event.frame(matches, "msgpack"))
+            else:
+                await socket.send_text(event.frame(matches))
 
     async def handle_messages(
-        self, socket: WebSocket, session: Session, channels: ChannelsPlugin
+        self,
+        socket: WebSocket,
+        connection: EventConnection,
+        dispatcher: EventDispatcher,
+        last_id: str | None = None,
     ):
-        async with channels.start_subscription("events") as subscriber:
-            async for message in subscriber.iter_events():
-                try:
-                    decoded = json.loads(message)
-                    event = EVENTS(decoded)
-                    if event:
-                        context = await session.get_event_context()
-                        matches = glob_match(event.path, context.subscriptions)
-                        if len(matches) > 0:
-                            normalized_event = FrontendEvent(
-                                id=event.id,
-                                source=event.source,
-                                type=event.path,
-                                channel=(
-                                    "global" if event.scope == "global" else "session"
-                                ),
-                                data={
-                                    k: v
-                                    for k, v in event.model_dump(mode="json").items()
-                                    if not k
-                                    in [
-                                        "id",
-                                        "source",
-                                        "scope",
-                                        "path",
-                                        "emitted",
-                                        "is_global",
-                                    ]
-                                },
-                                subscribers=matches,
-                            )
-                            if event.scope == "global":
-                                await socket.send_json(
-                                    normalized_event.model_dump(mode="json")
-                                )
-                            else:
-                                if session.user_id:
-                                    user = await session.user()
-                                    if user.has_scope(*event.scope):
-                                        await socket.send_json(
-                                            normalized_event.model_dump(mode="json")
-                                        )
-                except json.JSONDecodeError:
-                    print_exc()
+        queue = dispatcher.register()
+        backlog = dispatcher.replay(last_id) if last_id else []
+        try:
+            if backlog == None:
+                resync = make_resync_frame(last_id, connection.encoding)
+                if connection.encoding == "msgpack":
+                    await socket.send_bytes(resync)
+                else:
+                    await socket.send_text(resync)
+            else:
+                for event in backlog:
+                    await self.send_event(socket, connection, event)
+
+            while True:
+                await self.send_event(socket, connection, await queue.get())
+        finally:
+            dispatcher.unregister(queue)
+
+    @get("/stats", guards=[guard_scoped("admin.plugins.manage")])
+    async def get_event_stats(self) -> dict[str, int]:
+        return EVENTS.coalescer.stats if EVENTS.coalescer else {}
 
     @websocket("/ws")
-    async def event_handler(self, socket: WebSocket, channels: ChannelsPlugin) -> None:
+    async def event_handler(
+        self,
+        socket: WebSocket,
+        dispatcher: EventDispatcher,
+        sessions: SessionStore,
+        encoding: EventEncoding = "json",
+        last_id: str | None = None,
+    ) -> None:
         await socket.accept()
-        if not "tokens.raven" in socket.cookies.keys():
-            await socket.close(
-                code=WS_1008_POLICY_VIOLATION, reason="Valid session token required"
-            )
-        session = await Session.get(socket.cookies.get("tokens.raven"))
+        session = (
+            await sessions.get(socket.cookies.get("tokens.raven"))
+            if "tokens.raven" in socket.cookies.keys()
+            else None
+        )
         if not session:
             await socket.close(
                 code=WS_1008_POLICY_VIOLATION, reason="Valid session token required"
             )
+            return
+
+        connection = await EventConnection.open(session, encoding=encoding)
         try:
             async with TaskGroup() as group:
-                group.create_task(self.handle_commands(socket, session))
-                group.create_task(self.handle_messages(socket, session, channels))
+                group.create_task(self.handle_commands(socket, connection))
+                group.create_task(
+                    self.handle_messages(socket, connection, dispatcher, last_id)
+                )
             try:
                 await socket.close()
             except:
                 pass
         except:
             pass
+        finally:
+            await connection.close()
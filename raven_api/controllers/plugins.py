@@ -1,5 +1,15 @@
-from litestar import Controller, get
-from ..util import guard_logged_in, PluginLoader, Plugin, PluginManifest
+from typing import Any
+from litestar import Controller, Request, get, post
+from ..util import (
+    ExecutionScheduler,
+    guard_logged_in,
+    guard_scoped,
+    Context,
+    PluginLoader,
+    Plugin,
+    PluginManifest,
+)
+from ..common.plugin import EVENTS
 from litestar.exceptions import *
 
 
@@ -11,6 +21,27 @@ class PluginsController(Controller):
     async def get_plugins(self, plugins: PluginLoader) -> dict[str, PluginManifest]:
         return {k: v.manifest for k, v in plugins.items()}
 
+    @get("/cache", guards=[guard_scoped("admin.plugins.manage")])
+    async def get_cache_stats(self, plugins: PluginLoader) -> dict[str, dict[str, int]]:
+        return {
+            "resources": plugins.resource_cache.stats,
+            "executors": plugins.executor_cache.stats,
+        }
+
+    @get("/calls", guards=[guard_scoped("admin.plugins.manage")])
+    async def get_call_stats(self, plugins: PluginLoader) -> dict[str, dict[str, Any]]:
+        return plugins.calls.stats
+
+    @get("/jobs", guards=[guard_scoped("admin.plugins.manage")])
+    async def get_job_stats(
+        self, scheduler: ExecutionScheduler
+    ) -> dict[str, dict[str, int]]:
+        return scheduler.stats
+
+    @get("/imports", guards=[guard_scoped("admin.plugins.manage")])
+    async def get_import_times(self, plugins: PluginLoader) -> dict[str, float | None]:
+        return plugins.import_times
+
     @get("/{plugin_name:str}")
     async def get_plugin(
         self, plugins: PluginLoader, plugin_name: str
@@ -19,3 +50,25 @@ class PluginsController(Controller):
         if not result:
             raise NotFoundException(f"Unknown plugin {[plugin_name]}")
         return result.manifest
+
+    @post("/{plugin_name:str}/reload", guards=[guard_scoped("admin.plugins.manage")])
+    async def reload_plugin(
+        self, request: Request, context: Context, plugin_name: str
+    ) -> PluginManifest:
+        """Reloads the plugin on every API worker."""
+        try:
+            plugin = await context.reload_plugin(plugin_name)
+        except KeyError:
+            raise NotFoundException(f"Unknown plugin {[plugin_name]}")
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except Exception:
+            # Litestar logs server errors along with the exception that caused them
+            raise HTTPException(status_code=500, detail="Reload failed")
+
+        EVENTS.make_emitter(request.app)(
+            "plugin.reload",
+            {"slug": plugin_name, "worker": context.plugins.worker_id},
+            scopes=["admin.plugins.manage"],
+        )
+        return plugin.manifest
@@ -1,7 +1,9 @@
 import asyncio
-from typing import Any
-from litestar import Controller, get, post
-from pydantic import BaseModel
+from traceback import print_exc
+from typing import Any, AsyncGenerator
+from litestar import Controller, Request, Response, get, post
+from litestar.response import Stream
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from ..util import (
     guard_logged_in,
     PluginLoader,
@@ -9,40 +11,115 @@ from ..util import (
     PluginManifest,
     provide_user,
     guard_scoped,
+    CallStatus,
+    CircuitOpenError,
+    ExecutionResult,
+    ExecutionPriority,
+    ExecutionQueueFull,
+    ExecutionJob,
+    ExecutionScheduler,
 )
-from ..common.plugin import Resource, Executor, ExecutionTarget, match_execution_targets
+from ..common.plugin import Resource, Executor, ExecutionTarget
 from ..common.models import User
 from litestar.exceptions import *
 from litestar.di import Provide
 
+TARGET_LIST = TypeAdapter(list[ExecutionTarget | list[ExecutionTarget]])
+
+
+class ResourceListing(BaseModel):
+    resources: list[Resource]
+    plugins: dict[str, CallStatus]
+
+
+class ExecutorListing(BaseModel):
+    executors: list[Executor]
+    plugins: dict[str, CallStatus]
+
+
+def handle_timeout(request: Request, exc: TimeoutError) -> Response:
+    return Response({"status_code": 504, "detail": "Plugin timed out"}, status_code=504)
+
+
+def handle_circuit_open(request: Request, exc: CircuitOpenError) -> Response:
+    return Response({"status_code": 503, "detail": str(exc)}, status_code=503)
+
 
 class ExecutionModel(BaseModel):
     target: Resource
     executor: Executor
     args: dict[str, Any]
+    queue: bool = False
+    priority: ExecutionPriority = "normal"
+
+
+class BulkExecutionModel(BaseModel):
+    executor: Executor | None = None
+    args: dict[str, Any] = {}
+    targets: list[Resource] = []
+    calls: list[ExecutionModel] = []
 
 
 class ResourceController(Controller):
     path = "/resources"
     guards = [guard_logged_in, guard_scoped("resources.*")]
     dependencies = {"user": Provide(provide_user)}
+    exception_handlers = {
+        TimeoutError: handle_timeout,
+        CircuitOpenError: handle_circuit_open,
+    }
 
     @get("/")
-    async def get_resources(self, user: User, plugins: PluginLoader) -> list[Resource]:
+    async def get_resources(self, user: User, plugins: PluginLoader) -> ResourceListing:
         scoped_all = user.has_scope("resources.all.*")
         tasks = []
+        statuses: dict[str, CallStatus] = {}
 
         async with asyncio.TaskGroup() as group:
             for plugin in plugins.plugins.values():
                 if not scoped_all:
                     if not user.has_scope(f"resources.plugin.{plugin.manifest.slug}.*"):
                         continue
-                tasks.append(group.create_task(plugin.get_resources()))
+                statuses[plugin.manifest.slug] = CallStatus()
+                tasks.append(
+                    group.create_task(
+                        plugin.get_resources(statuses[plugin.manifest.slug])
+                    )
+                )
 
         results = []
         for t in tasks:
             results.extend(t.result())
-        return results
+        return ResourceListing(resources=results, plugins=statuses)
+
+    @get("/stream")
+    async def stream_resources(self, user: User, plugins: PluginLoader) -> Stream:
+        """Newline-delimited JSON resources, written as each plugin finishes."""
+        scoped_all = user.has_scope("resources.all.*")
+        selected = [
+            plugin
+            for plugin in plugins.plugins.values()
+            if scoped_all
+            or user.has_scope(f"resources.plugin.{plugin.manifest.slug}.*")
+        ]
+
+        async def generate() -> AsyncGenerator[bytes, None]:
+            tasks = [asyncio.create_task(plugin.get_resources()) for plugin in selected]
+            try:
+                for next_task in asyncio.as_completed(tasks):
+                    try:
+                        resources = await next_task
+                    except:
+                        print_exc()
+                        continue
+
+                    for resource in resources:
+                        yield (resource.model_dump_json() + "\n").encode()
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return Stream(generate(), media_type="application/x-ndjson")
 
     @post(
         "/executors",
@@ -50,9 +127,10 @@ class ResourceController(Controller):
     )
     async def get_executors_for_resources(
         self, user: User, plugins: PluginLoader, data: list[Resource]
-    ) -> list[Executor]:
+    ) -> ExecutorListing:
         scoped_all = user.has_scope("resources.all.execute")
         tasks = []
+        statuses: dict[str, CallStatus] = {}
 
         async with asyncio.TaskGroup() as group:
             for plugin in plugins.plugins.values():
@@ -61,53 +139,139 @@ class ResourceController(Controller):
                         f"resources.plugin.{plugin.manifest.slug}.execute"
                     ):
                         continue
+                statuses[plugin.manifest.slug] = CallStatus()
                 tasks.append(
-                    group.create_task(plugin.get_executors_for_resources(data))
+                    group.create_task(
+                        plugin.get_executors_for_resources(
+                            data, statuses[plugin.manifest.slug]
+                        )
+                    )
                 )
 
         results = []
         for t in tasks:
             results.extend(t.result())
-        return results
+        return ExecutorListing(executors=results, plugins=statuses)
 
     @post("/filtered")
     async def get_filtered(
         self,
         user: User,
         plugins: PluginLoader,
-        data: Any,
-    ) -> list[Resource]:
-        scoped_all = user.has_scope("resources.all.*")
-        tasks = []
-
-        async with asyncio.TaskGroup() as group:
-            for plugin in plugins.plugins.values():
-                if not scoped_all:
-                    if not user.has_scope(f"resources.plugin.{plugin.manifest.slug}.*"):
-                        continue
-                tasks.append(group.create_task(plugin.get_resources()))
-
-        results = []
-        for t in tasks:
-            results.extend(t.result())
+        data: list[Any],
+    ) -> ResourceListing:
+        try:
+            targets = TARGET_LIST.validate_python(data)
+        except ValidationError as e:
+            raise ValidationException(
+                "Invalid execution targets",
+                extra=e.errors(include_url=False, include_context=False),
+            )
 
-        return [i for i in results if match_execution_targets(data, i)]
+        scoped_all = user.has_scope("resources.all.*")
+        statuses = {
+            slug: CallStatus()
+            for slug in plugins.keys()
+            if scoped_all or user.has_scope(f"resources.plugin.{slug}.*")
+        }
+        resources = await plugins.query_resources(targets, statuses)
+        return ResourceListing(resources=resources, plugins=statuses)
 
     @post(
         "/execute",
         guards=[guard_scoped("resources.all.execute", "resources.plugin.*.execute")],
     )
     async def execute_on_resource(
-        self, user: User, plugins: PluginLoader, data: ExecutionModel
-    ) -> None:
+        self,
+        user: User,
+        plugins: PluginLoader,
+        scheduler: ExecutionScheduler,
+        data: ExecutionModel,
+    ) -> ExecutionJob | None:
+        """Runs the executor inline, or with `queue` set, schedules it as a job."""
         if user.has_scope(
             "resources.all.execute", f"resources.plugin.{data.executor.plugin}.execute"
         ):
             plugin = plugins.get(data.executor.plugin)
-            await plugin.call_executor(data.executor, data.args, data.target)
+            if not plugin:
+                raise NotFoundException("Unknown plugin")
+            if data.queue:
+                try:
+                    return await scheduler.submit(
+                        user.id, data.executor, data.args, data.target, data.priority
+                    )
+                except ExecutionQueueFull as e:
+                    raise TooManyRequestsException(str(e))
+            try:
+                await plugin.call_executor(data.executor, data.args, data.target)
+            except (TimeoutError, CircuitOpenError):
+                raise
+            except Exception:
+                print_exc()
+                raise HTTPException(status_code=502, detail="Executor failed")
             return None
         raise NotAuthorizedException("Insufficient scope to execute")
 
+    @post(
+        "/execute/bulk",
+        guards=[guard_scoped("resources.all.execute", "resources.plugin.*.execute")],
+    )
+    async def execute_bulk(
+        self, user: User, plugins: PluginLoader, data: BulkExecutionModel
+    ) -> list[ExecutionResult]:
+        """Runs `executor` on every target, then every call."""
+        if len(data.targets) > 0 and data.executor == None:
+            raise ValidationException("An executor is required to run on targets")
+        if len(data.targets) + len(data.calls) > plugins.config.calls.bulk_max_calls:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {plugins.config.calls.bulk_max_calls} calls per request",
+            )
+
+        calls = [(data.executor, data.args, target) for target in data.targets] + [
+            (call.executor, call.args, call.target) for call in data.calls
+        ]
+        allowed = [
+            user.has_scope(
+                "resources.all.execute", f"resources.plugin.{executor.plugin}.execute"
+            )
+            for executor, _, _ in calls
+        ]
+        executed = iter(
+            await plugins.execute_many([call for call, ok in zip(calls, allowed) if ok])
+        )
+        return [
+            (
+                next(executed)
+                if ok
+                else ExecutionResult(
+                    plugin=executor.plugin,
+                    executor=executor.id,
+                    target=target.id,
+                    status="forbidden",
+                )
+            )
+            for (executor, _, target), ok in zip(calls, allowed)
+        ]
+
+    @get(
+        "/jobs/{job_id:str}",
+        guards=[guard_scoped("resources.all.execute", "resources.plugin.*.execute")],
+    )
+    async def get_job(
+        self, user: User, scheduler: ExecutionScheduler, job_id: str
+    ) -> ExecutionJob:
+        job = await scheduler.get(job_id)
+        if (
+            job
+            and job.user == user.id
+            and user.has_scope(
+                "resources.all.execute", f"resources.plugin.{job.plugin}.execute"
+            )
+        ):
+            return job
+        raise NotFoundException("Unknown job")
+
     @get(
         path="/single/{plugin_name:str}/{resource_id:str}",
         guards=[guard_scoped("resources.all.execute", "resources.plugin.*.execute")],
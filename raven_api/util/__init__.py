@@ -1,4 +1,30 @@
 from .plugin import *
+from .plugin_calls import (
+    CallStatus,
+    CircuitOpenError,
+    ExecutionResult,
+    ExportGuard,
+    PluginCalls,
+)
 from .context import Context
+from .startup import STARTUP, StartupPhase, StartupProfiler, StartupReport
+from .execution_queue import (
+    ExecutionPriority,
+    ExecutionQueueFull,
+    ExecutionJob,
+    ExecutionScheduler,
+    provide_scheduler,
+)
 from .inject import *
-from .events import listen_core_events
+from .events import (
+    listen_core_events,
+    make_channels_backend,
+    FrontendEvent,
+    DispatchedEvent,
+    EventEncoding,
+    make_resync_frame,
+    EventDispatcher,
+    provide_dispatcher,
+    WorkerLease,
+)
+from .event_coalescer import EventCoalescer
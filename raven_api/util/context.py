@@ -1,7 +1,14 @@
+from asyncio import Task, create_task
+from traceback import print_exc
 from typing import Any
 from ..common.models import Config, Scope, CORE_SCOPE
-from ..common.plugin import LifecycleContext
-from .plugin import PluginLoader
+from ..common.plugin import (
+    EVENT_TYPES,
+    LifecycleContext,
+    PluginManifest,
+    PluginReloadEvent,
+)
+from .plugin import Plugin, PluginLoader
 from redis.asyncio import Redis
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
@@ -19,28 +26,54 @@ class Context:
         self.redis = redis
         self.mongodb = mongodb
         self.scope = Scope.from_spec(CORE_SCOPE)
+        self._reloads: set[Task] = set()
 
         for plugin_key, plugin in self.plugins.items():
-            self.scope.add_scope(
-                f"resources.plugin",
-                Scope(
-                    id=plugin_key,
-                    parent="resources.plugin",
-                    display_name=plugin.manifest.name,
-                    children={
-                        "view": Scope(
-                            id="view",
-                            parent=f"resources.plugin.{plugin_key}",
-                            display_name="View",
-                        ),
-                        "execute": Scope(
-                            id="execute",
-                            parent=f"resources.plugin.{plugin_key}",
-                            display_name="Execute",
-                        ),
-                    },
-                ),
-            )
+            self.add_plugin_scope(plugin_key, plugin.manifest)
+
+    def add_plugin_scope(self, plugin_key: str, manifest: PluginManifest):
+        """Adds (or replaces in place) the resources.plugin.<key> scope subtree."""
+        self.scope.add_scope(
+            f"resources.plugin",
+            Scope(
+                id=plugin_key,
+                parent="resources.plugin",
+                display_name=manifest.name,
+                children={
+                    "view": Scope(
+                        id="view",
+                        parent=f"resources.plugin.{plugin_key}",
+                        display_name="View",
+                    ),
+                    "execute": Scope(
+                        id="execute",
+                        parent=f"resources.plugin.{plugin_key}",
+                        display_name="Execute",
+                    ),
+                },
+            ),
+        )
+
+    async def reload_plugin(self, plugin_key: str) -> Plugin:
+        plugin = await self.plugins.reload(plugin_key)
+        self.add_plugin_scope(plugin_key, plugin.manifest)
+        return plugin
+
+    async def _reload_broadcast(self, plugin_key: str) -> None:
+        try:
+            await self.reload_plugin(plugin_key)
+        except Exception:
+            print_exc()
+
+    def handle_event(self, event: EVENT_TYPES) -> None:
+        """Reloads plugins that another API worker has reloaded."""
+        if (
+            isinstance(event, PluginReloadEvent)
+            and event.worker != self.plugins.worker_id
+        ):
+            task = create_task(self._reload_broadcast(event.slug))
+            self._reloads.add(task)
+            task.add_done_callback(self._reloads.discard)
 
     @property
     def lifecycle(self) -> LifecycleContext:
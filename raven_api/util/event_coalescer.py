@@ -0,0 +1,83 @@
+from asyncio import CancelledError, create_task, sleep
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from traceback import print_exc
+from litestar import Litestar
+from ..common.plugin import EVENTS, BaseEvent
+
+
+class EventCoalescer:
+    """Buffers events for a short window, collapsing repeats per entity."""
+
+    def __init__(
+        self, window: float = 0.1, paths: list[str] = [], queue_size: int = 1000
+    ):
+        self.window = window
+        self.paths = set(paths)
+        self.queue_size = queue_size
+        self.merged = 0
+        self.dropped = 0
+        self.emitted = 0
+        self._pending: OrderedDict[
+            tuple[str, str, str], tuple[BaseEvent, Litestar, str]
+        ] = OrderedDict()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "emitted": self.emitted,
+        }
+
+    def submit(self, app: Litestar, listener: str, event: BaseEvent) -> None:
+        if (
+            self.window <= 0
+            or not event.path in self.paths
+            or not hasattr(event, "entity_id")
+        ):
+            app.emit(listener, event=event, app=app)
+            self.emitted += 1
+            return
+
+        key = (event.path, event.source, event.entity_id)
+        if key in self._pending.keys():
+            self._pending[key] = (event, app, listener)
+            self.merged += 1
+            return
+
+        while len(self._pending) >= self.queue_size:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[key] = (event, app, listener)
+
+    def flush(self) -> None:
+        pending = self._pending
+        self._pending = OrderedDict()
+        for event, app, listener in pending.values():
+            app.emit(listener, event=event, app=app)
+            self.emitted += 1
+
+    @asynccontextmanager
+    async def run(self):
+        async def flush_loop():
+            while True:
+                await sleep(self.window)
+                try:
+                    self.flush()
+                except CancelledError:
+                    raise
+                except:
+                    print_exc()
+
+        task = create_task(flush_loop()) if self.window > 0 else None
+        EVENTS.coalescer = self
+        try:
+            yield self
+        finally:
+            if EVENTS.coalescer is self:
+                EVENTS.coalescer = None
+            if task:
+                task.cancel()
+            self.flush()
@@ -1,11 +1,279 @@
+from asyncio import (
+    CancelledError,
+    Queue,
+    QueueEmpty,
+    QueueFull,
+    create_task,
+    sleep,
+)
+from collections import deque
+from contextlib import asynccontextmanager
+import json
+from traceback import print_exc
+from logging import Logger
+from typing import Any, Awaitable, Callable, Literal
+from uuid import uuid4
 from litestar.events import listener
+from msgspec import msgpack
 from litestar.channels import ChannelsPlugin
+from litestar.channels.backends.base import ChannelsBackend
+from litestar.channels.backends.memory import MemoryChannelsBackend
+from litestar.channels.backends.redis import (
+    RedisChannelsPubSubBackend,
+    RedisChannelsStreamBackend,
+)
+from redis.asyncio import Redis
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError, RedisError
 from litestar import Litestar
-from ..common.plugin import EVENT_TYPES
+from litestar.datastructures import State
+from pydantic import BaseModel, computed_field
+from ..common.plugin import EVENT_TYPES, EVENTS, ResourceUpdateEvent
+from ..common.models.config import StorageChannelsConfig
 
 
 @listener("core")
 async def listen_core_events(event: EVENT_TYPES = None, app: Litestar = None) -> None:
     channels = app.plugins.get(ChannelsPlugin)
     if event:
-        channels.publish(event.model_dump(), "events")
+        if (
+            isinstance(event, ResourceUpdateEvent)
+            and event.source != "core"
+            and event.changes == None
+            and not event.deleted
+        ):
+            context = app.state.get("context", None)
+            if context:
+                context.plugins.schedule_update(
+                    event,
+                    lambda resolved: channels.publish(
+                        resolved.model_dump(mode="json"), "events"
+                    ),
+                )
+                return
+        channels.publish(event.model_dump(mode="json"), "events")
+
+
+def make_channels_backend(
+    config: StorageChannelsConfig, redis: Redis
+) -> ChannelsBackend:
+    match config.backend:
+        case "redis_pubsub":
+            return RedisChannelsPubSubBackend(redis=redis, key_prefix=config.key_prefix)
+        case "redis_stream":
+            return RedisChannelsStreamBackend(
+                config.history,
+                redis=redis,
+                stream_ttl=config.stream_ttl,
+                key_prefix=config.key_prefix,
+            )
+        case _:
+            return MemoryChannelsBackend()
+
+
+class WorkerLease:
+    """A renewed Redis lock that at most one worker process holds at a time."""
+
+    def __init__(self, redis: Redis, key: str, ttl: float, logger: Logger):
+        self.key = key
+        self.ttl = ttl
+        self.logger = logger
+        self.held = False
+        self._lock = Lock(redis, key, timeout=ttl, blocking=False, thread_local=False)
+
+    async def _renew(
+        self,
+        on_acquire: Callable[[], Awaitable[None]],
+        on_release: Callable[[], Awaitable[None]],
+    ) -> None:
+        while True:
+            try:
+                if self.held:
+                    await self._lock.reacquire()
+                elif await self._lock.acquire():
+                    self.held = True
+                    self.logger.info(f"Acquired worker lease {self.key}")
+                    await on_acquire()
+            except LockError:
+                if self.held:
+                    self.held = False
+                    self.logger.warning(f"Lost worker lease {self.key}")
+                    await on_release()
+            except RedisError:
+                print_exc()
+            await sleep(self.ttl / 3)
+
+    @asynccontextmanager
+    async def run(
+        self,
+        on_acquire: Callable[[], Awaitable[None]],
+        on_release: Callable[[], Awaitable[None]],
+    ):
+        task = create_task(self._renew(on_acquire, on_release))
+        try:
+            yield self
+        finally:
+            task.cancel()
+            if self.held:
+                self.held = False
+                await on_release()
+                try:
+                    await self._lock.release()
+                except RedisError:
+                    pass
+
+
+class FrontendEvent(BaseModel):
+    id: str
+    source: str
+    type: str
+    channel: Literal["global", "session"]
+    data: Any
+    subscribers: list[str]
+
+    @computed_field
+    @property
+    def plugin(self) -> str | None:
+        if self.source == "core":
+            return None
+        else:
+            return self.source.split(":")[0]
+
+
+EventEncoding = Literal["json", "msgpack"]
+
+
+class DispatchedEvent:
+    """A channel event decoded once and shared by every connected socket."""
+
+    def __init__(self, event: EVENT_TYPES):
+        self.event = event
+        self.id = event.id
+        self.path = event.path
+        self.scope = event.scope
+        self.is_global = event.scope == "global"
+        normalized = FrontendEvent(
+            id=event.id,
+            source=event.source,
+            type=event.path,
+            channel="global" if self.is_global else "session",
+            data=event.model_dump(
+                mode="json",
+                exclude={"id", "source", "scope", "path", "emitted"},
+            ),
+            subscribers=[],
+        )
+        self._data = normalized.model_dump(mode="json", exclude={"subscribers"})
+        self._body = json.dumps(self._data)
+        self._frames: dict[tuple[EventEncoding, tuple[str, ...]], str | bytes] = {}
+
+    def frame(
+        self, subscribers: list[str], encoding: EventEncoding = "json"
+    ) -> str | bytes:
+        key = (encoding, tuple(subscribers))
+        if not key in self._frames.keys():
+            if encoding == "msgpack":
+                self._frames[key] = msgpack.encode(
+                    {**self._data, "subscribers": subscribers}
+                )
+            else:
+                self._frames[key] = (
+                    self._body[:-1]
+                    + ', "subscribers": '
+                    + json.dumps(subscribers)
+                    + "}"
+                )
+        return self._frames[key]
+
+
+def make_resync_frame(last_id: str, encoding: EventEncoding = "json") -> str | bytes:
+    """Tells a resuming client that `last_id` is no longer buffered and it must refetch."""
+    data = FrontendEvent(
+        id=uuid4().hex,
+        source="core",
+        type="events.resync",
+        channel="global",
+        data={"last_id": last_id},
+        subscribers=["events.resync"],
+    ).model_dump(mode="json")
+    return msgpack.encode(data) if encoding == "msgpack" else json.dumps(data)
+
+
+class EventDispatcher:
+    """Holds the single channel subscription and fans events out to sockets."""
+
+    def __init__(
+        self,
+        channels: ChannelsPlugin,
+        handlers: list[Callable[[EVENT_TYPES], None]] = [],
+        queue_size: int = 256,
+        history: int = 500,
+    ):
+        self.channels = channels
+        self.handlers = handlers
+        self.queue_size = queue_size
+        self._queues: set[Queue[DispatchedEvent]] = set()
+        self._history: deque[DispatchedEvent] = deque(maxlen=history)
+
+    def register(self) -> Queue[DispatchedEvent]:
+        queue: Queue[DispatchedEvent] = Queue(maxsize=self.queue_size)
+        self._queues.add(queue)
+        return queue
+
+    def unregister(self, queue: Queue[DispatchedEvent]) -> None:
+        self._queues.discard(queue)
+
+    def replay(self, last_id: str) -> list[DispatchedEvent] | None:
+        """Events after `last_id`, or None if evicted. Call right after `register`."""
+        for index in range(len(self._history) - 1, -1, -1):
+            if self._history[index].id == last_id:
+                return list(self._history)[index + 1 :]
+        return None
+
+    def dispatch(self, message: bytes | str) -> None:
+        try:
+            event = EVENTS(json.loads(message))
+        except json.JSONDecodeError:
+            print_exc()
+            return
+
+        if event:
+            for handler in self.handlers:
+                try:
+                    handler(event)
+                except:
+                    print_exc()
+
+            dispatched = DispatchedEvent(event)
+            self._history.append(dispatched)
+            for queue in list(self._queues):
+                try:
+                    queue.put_nowait(dispatched)
+                except QueueFull:
+                    try:
+                        queue.get_nowait()
+                    except QueueEmpty:
+                        pass
+                    queue.put_nowait(dispatched)
+
+    @asynccontextmanager
+    async def run(self):
+        async def dispatch_loop():
+            async with self.channels.start_subscription("events") as subscriber:
+                async for message in subscriber.iter_events():
+                    try:
+                        self.dispatch(message)
+                    except CancelledError:
+                        raise
+                    except:
+                        print_exc()
+
+        task = create_task(dispatch_loop())
+        try:
+            yield self
+        finally:
+            task.cancel()
+
+
+async def provide_dispatcher(state: State) -> EventDispatcher:
+    return state.dispatcher
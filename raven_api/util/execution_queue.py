@@ -0,0 +1,262 @@
+from asyncio import CancelledError, Condition, Task, create_task, gather
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from heapq import heappop, heappush
+from itertools import count
+from traceback import print_exc
+from typing import Any, Literal
+from uuid import uuid4
+from litestar import Litestar
+from litestar.datastructures import State
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from ..common.plugin import EVENTS, Executor, Resource
+from ..common.models.config import ExecutionQueueConfig
+from .plugin import PluginLoader
+from .plugin_calls import ExecutionResult
+
+ExecutionPriority = Literal["critical", "normal", "bulk"]
+PRIORITIES: dict[ExecutionPriority, int] = {"critical": 0, "normal": 1, "bulk": 2}
+
+
+class ExecutionQueueFull(Exception):
+    """Raised when a plugin's execution queue is at its configured depth."""
+
+
+class ExecutionJob(BaseModel):
+    id: str
+    user: str
+    plugin: str
+    executor: str
+    target: str
+    priority: ExecutionPriority
+    status: Literal["queued", "running", "done", "failed", "cancelled"] = "queued"
+    queued: datetime
+    started: datetime | None = None
+    finished: datetime | None = None
+    result: ExecutionResult | None = None
+
+
+QueueItem = tuple[int, int, ExecutionJob, Executor, dict[str, Any], Resource]
+
+
+class PluginQueue:
+    """One plugin's queued jobs, taken in priority order, then in submission order."""
+
+    def __init__(self):
+        self.items: list[QueueItem] = []
+        self.depths: dict[int, int] = {}
+        self._changed = Condition()
+
+    async def put(self, item: QueueItem) -> None:
+        async with self._changed:
+            heappush(self.items, item)
+            self.depths[item[0]] = self.depths.get(item[0], 0) + 1
+            self._changed.notify_all()
+
+    async def take(self, critical_only: bool = False) -> QueueItem:
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: len(self.items) > 0
+                and (not critical_only or self.items[0][0] == PRIORITIES["critical"])
+            )
+            item = heappop(self.items)
+            self.depths[item[0]] -= 1
+            return item
+
+
+class ExecutionScheduler:
+    """Queues executor calls per plugin and runs them on that plugin's workers."""
+
+    def __init__(
+        self,
+        plugins: PluginLoader,
+        config: ExecutionQueueConfig,
+        redis: Redis | None = None,
+    ):
+        self.plugins = plugins
+        self.config = config
+        self.redis = redis
+        self._queues: dict[str, PluginQueue] = {}
+        self._workers: list[Task] = []
+        self._jobs: OrderedDict[str, ExecutionJob] = OrderedDict()
+        self._counter = count()
+        self._app: Litestar | None = None
+
+    @property
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            plugin: {
+                "queued": len(queue.items),
+                "running": len(
+                    [
+                        i
+                        for i in self._jobs.values()
+                        if i.plugin == plugin and i.status == "running"
+                    ]
+                ),
+                "failed": len(
+                    [
+                        i
+                        for i in self._jobs.values()
+                        if i.plugin == plugin and i.status == "failed"
+                    ]
+                ),
+            }
+            for plugin, queue in self._queues.items()
+        }
+
+    async def get(self, job_id: str) -> ExecutionJob | None:
+        if job_id in self._jobs.keys():
+            return self._jobs[job_id]
+        if self.redis == None:
+            return None
+        try:
+            stored = await self.redis.get(f"{self.config.key_prefix}:{job_id}")
+        except RedisError:
+            print_exc()
+            return None
+        return ExecutionJob.model_validate_json(stored) if stored else None
+
+    async def _store(self, job: ExecutionJob) -> None:
+        if self.redis == None:
+            return
+        try:
+            await self.redis.set(
+                f"{self.config.key_prefix}:{job.id}",
+                job.model_dump_json(),
+                ex=self.config.job_ttl,
+            )
+        except RedisError:
+            print_exc()
+
+    def _queue(self, plugin: str) -> PluginQueue:
+        if not plugin in self._queues.keys():
+            queue = PluginQueue()
+            self._queues[plugin] = queue
+            for _ in range(
+                max(self.config.plugin_workers.get(plugin, self.config.workers), 1)
+            ):
+                self._workers.append(create_task(self._work(queue)))
+            for _ in range(max(self.config.critical_workers, 0)):
+                self._workers.append(create_task(self._work(queue, critical_only=True)))
+        return self._queues[plugin]
+
+    async def submit(
+        self,
+        user: str,
+        executor: Executor,
+        arguments: dict[str, Any],
+        target: Resource,
+        priority: ExecutionPriority = "normal",
+    ) -> ExecutionJob:
+        queue = self._queue(executor.plugin)
+        if queue.depths.get(PRIORITIES[priority], 0) >= self.config.max_depth:
+            raise ExecutionQueueFull(
+                f"Execution queue for {executor.plugin} is full ({priority})"
+            )
+
+        job = ExecutionJob(
+            id=uuid4().hex,
+            user=user,
+            plugin=executor.plugin,
+            executor=executor.id,
+            target=target.id,
+            priority=priority,
+            queued=datetime.now(UTC),
+        )
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.config.history:
+            self._jobs.popitem(last=False)
+
+        await self._store(job)
+        await queue.put(
+            (
+                PRIORITIES[priority],
+                next(self._counter),
+                job,
+                executor,
+                arguments,
+                target,
+            )
+        )
+        return job
+
+    def _complete(self, job: ExecutionJob) -> None:
+        if self._app == None:
+            return
+        EVENTS.make_emitter(self._app)(
+            "execution.complete",
+            {
+                "job_id": job.id,
+                "plugin": job.plugin,
+                "executor": job.executor,
+                "target": job.target,
+                "status": job.result.status,
+                "elapsed": job.result.elapsed,
+            },
+            scopes=["resources.all.execute", f"resources.plugin.{job.plugin}.execute"],
+        )
+
+    async def _finish(self, job: ExecutionJob, error: str) -> None:
+        """Records a job that stopped, filling in `error` if it has no result."""
+        job.finished = datetime.now(UTC)
+        if job.result == None:
+            job.result = ExecutionResult(
+                plugin=job.plugin,
+                executor=job.executor,
+                target=job.target,
+                status="error",
+                error=error,
+            )
+        await self._store(job)
+        try:
+            self._complete(job)
+        except:
+            print_exc()
+
+    async def _work(self, queue: PluginQueue, critical_only: bool = False) -> None:
+        while True:
+            _, _, job, executor, arguments, target = await queue.take(critical_only)
+            try:
+                job.status = "running"
+                job.started = datetime.now(UTC)
+                await self._store(job)
+                job.result = await self.plugins.execute(executor, arguments, target)
+                job.status = "done" if job.result.status == "ok" else "failed"
+            except CancelledError:
+                job.status = "cancelled"
+                raise
+            except:
+                print_exc()
+                job.status = "failed"
+            finally:
+                await self._finish(
+                    job,
+                    "Cancelled" if job.status == "cancelled" else "Execution failed",
+                )
+
+    @asynccontextmanager
+    async def run(self, app: Litestar):
+        self._app = app
+        try:
+            yield self
+        finally:
+            workers = self._workers
+            self._workers = []
+            for worker in workers:
+                worker.cancel()
+            await gather(*workers, return_exceptions=True)
+
+            for queue in self._queues.values():
+                for _, _, job, _, _, _ in sorted(queue.items):
+                    job.status = "cancelled"
+                    await self._finish(job, "Cancelled")
+            self._queues = {}
+            self._app = None
+
+
+async def provide_scheduler(state: State) -> ExecutionScheduler:
+    return state.scheduler
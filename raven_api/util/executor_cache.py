@@ -0,0 +1,139 @@
+from asyncio import Task, create_task, shield
+from collections import OrderedDict
+from time import monotonic
+from typing import Awaitable, Callable
+from ..common.plugin import Resource, Executor
+from ..common.models.config import ExecutorCacheConfig
+
+ExecutorSignature = tuple[str, int, tuple[tuple[str, str, int], ...]]
+FetchExecutors = Callable[[], Awaitable[tuple[list[Executor], bool]]]
+
+
+class ExecutorCache:
+    """Executor discovery results per plugin, keyed by the requested resources."""
+
+    def __init__(self, config: ExecutorCacheConfig):
+        self.config = config
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[ExecutorSignature, tuple[float, list[Executor]]] = (
+            OrderedDict()
+        )
+        self._pending: dict[ExecutorSignature, Task[list[Executor]]] = {}
+        self._versions: dict[str, int] = {}
+        self._generations: dict[str, int] = {}
+        self._entity_refs: dict[str, int] = {}
+        self._plugin_refs: dict[str, int] = {}
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "pending": len(self._pending),
+            "tracked": len(self._entity_refs),
+        }
+
+    def signature(self, plugin: str, resources: list[Resource]) -> ExecutorSignature:
+        return (
+            plugin,
+            self._generations.get(plugin, 0),
+            tuple(
+                sorted((i.plugin, i.id, self._versions.get(i.id, 0)) for i in resources)
+            ),
+        )
+
+    def _retain(self, key: ExecutorSignature) -> None:
+        self._plugin_refs[key[0]] = self._plugin_refs.get(key[0], 0) + 1
+        for _, entity_id, _ in key[2]:
+            self._entity_refs[entity_id] = self._entity_refs.get(entity_id, 0) + 1
+
+    def _release(self, key: ExecutorSignature) -> None:
+        self._plugin_refs[key[0]] -= 1
+        if self._plugin_refs[key[0]] == 0:
+            del self._plugin_refs[key[0]]
+            self._generations.pop(key[0], None)
+        for _, entity_id, _ in key[2]:
+            self._entity_refs[entity_id] -= 1
+            if self._entity_refs[entity_id] == 0:
+                del self._entity_refs[entity_id]
+                self._versions.pop(entity_id, None)
+
+    def _evict(self, key: ExecutorSignature) -> None:
+        del self._entries[key]
+        self._release(key)
+
+    def _cached(self, key: ExecutorSignature) -> list[Executor] | None:
+        entry = self._entries.get(key, None)
+        if entry == None:
+            return None
+        if self.config.ttl != None and monotonic() - entry[0] > self.config.ttl:
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def _fetch(
+        self, key: ExecutorSignature, fetch: FetchExecutors
+    ) -> list[Executor]:
+        try:
+            executors, cacheable = await fetch()
+            # An invalidation during the fetch changes the key's generation or
+            # versions, so only results that are still current are stored.
+            if cacheable and self._current(key):
+                self._entries[key] = (monotonic(), executors)
+                self._retain(key)
+                while len(self._entries) > self.config.max_entries:
+                    self._evict(next(iter(self._entries)))
+            return executors
+        finally:
+            del self._pending[key]
+            self._release(key)
+
+    def _current(self, key: ExecutorSignature) -> bool:
+        return key[1] == self._generations.get(key[0], 0) and all(
+            version == self._versions.get(entity_id, 0)
+            for _, entity_id, version in key[2]
+        )
+
+    @staticmethod
+    def _consume(task: Task) -> None:
+        if not task.cancelled():
+            task.exception()
+
+    async def get(
+        self, plugin: str, resources: list[Resource], fetch: FetchExecutors
+    ) -> list[Executor]:
+        """Returns cached executors, or runs `fetch`, which says if it may be cached."""
+        if not self.config.enabled:
+            return (await fetch())[0]
+
+        key = self.signature(plugin, resources)
+        cached = self._cached(key)
+        if cached != None:
+            self.hits += 1
+            return list(cached)
+
+        if key in self._pending.keys():
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._retain(key)
+            self._pending[key] = create_task(self._fetch(key, fetch))
+            self._pending[key].add_done_callback(self._consume)
+
+        return list(await shield(self._pending[key]))
+
+    def touch(self, entity_id: str) -> None:
+        """Invalidates every entry that includes this resource."""
+        if entity_id in self._entity_refs.keys():
+            self._versions[entity_id] = self._versions.get(entity_id, 0) + 1
+
+    def invalidate(self, plugin: str | None = None) -> None:
+        for key in list(self._entries.keys()):
+            if plugin == None or key[0] == plugin:
+                self._evict(key)
+        for referenced in list(self._plugin_refs.keys()):
+            if plugin == None or referenced == plugin:
+                self._generations[referenced] = self._generations.get(referenced, 0) + 1
@@ -1,7 +1,9 @@
 from .session_middleware import (
     CookieSessionManager,
     get_session_from_connection,
+    get_user_from_connection,
     provide_session,
 )
+from .session_store import SessionStore, provide_sessions
 from .dependencies import *
 from .guards import *
@@ -5,6 +5,7 @@ from ...common.models import User, Session, Scope
 from litestar.datastructures import State
 from litestar.exceptions import *
 from ...common.plugin import EVENTS
+from .session_middleware import get_user_from_connection
 
 
 async def provide_context(state: State) -> Context:
@@ -23,10 +24,11 @@ async def provide_plugins(context: Context) -> PluginLoader:
     return context.plugins
 
 
-async def provide_user(session: Session) -> User:
-    if not session.user_id:
+async def provide_user(request: Request) -> User:
+    user = await get_user_from_connection(request)
+    if not user:
         raise NotAuthorizedException("Endpoint requires login")
-    return await session.user()
+    return user
 
 
 async def provide_user_scopes(user: User, context: Context) -> dict[str, Scope]:
@@ -1,4 +1,4 @@
-from .session_middleware import get_session_from_connection
+from .session_middleware import get_session_from_connection, get_user_from_connection
 from litestar.exceptions import *
 from litestar.connection import ASGIConnection
 from litestar.handlers.base import BaseRouteHandler
@@ -14,10 +14,9 @@ def guard_scoped(*scopes: str, all: bool = False):
     async def guard_scoped_inner(
         connection: ASGIConnection, _: BaseRouteHandler
     ) -> None:
-        session = await get_session_from_connection(connection)
-        if not session.user_id:
+        user = await get_user_from_connection(connection)
+        if not user:
             raise NotAuthorizedException("This endpoint requires login.")
-        user = await session.user()
         if not user.has_scope(*scopes, match_all=all):
             raise NotAuthorizedException(
                 "Insufficient permissions to access this endpoint"
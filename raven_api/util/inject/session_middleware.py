@@ -1,5 +1,6 @@
 from datetime import UTC, datetime
-from ...common.models import Session
+from ...common.models import Session, User
+from .session_store import SessionStore
 from litestar.datastructures import MutableScopeHeaders
 from litestar.types import Message, Receive, Scope, Send
 from litestar.connection import ASGIConnection
@@ -15,18 +16,17 @@ class CookieSessionManager(MiddlewareProtocol):
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] == "http":
             connection = ASGIConnection(scope, receive=receive, send=send)
+            sessions: SessionStore = connection.app.state.sessions
             active_token = (
-                await Session.get(connection.cookies.get("tokens.raven"))
+                await sessions.get(connection.cookies.get("tokens.raven"))
                 if "tokens.raven" in connection.cookies.keys()
                 else None
             )
             if active_token:
                 scope["token"] = active_token
-                await active_token.save()
+                sessions.touch(active_token)
             else:
-                new_session = Session.create()
-                await new_session.save()
-                scope["token"] = new_session
+                scope["token"] = await sessions.save(Session.create())
 
             async def send_wrapper(message: Message) -> None:
                 if message["type"] == "http.response.start":
@@ -45,3 +45,11 @@ async def provide_session(scope: Scope) -> Session:
 
 async def get_session_from_connection(connection: ASGIConnection) -> Session:
     return connection.scope["token"]
+
+
+async def get_user_from_connection(connection: ASGIConnection) -> User | None:
+    """Resolves the session's user once per request and memoizes it on the ASGI scope."""
+    if not "user" in connection.scope.keys():
+        session = await get_session_from_connection(connection)
+        connection.scope["user"] = await session.user()
+    return connection.scope["user"]
@@ -0,0 +1,136 @@
+from asyncio import CancelledError, Lock, create_task, sleep
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from time import monotonic
+from traceback import print_exc
+from beanie import BulkWriter
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from litestar.datastructures import State
+from ...common.models import Session
+from ...common.models.config import SessionStoreConfig
+
+
+class SessionStore:
+    """Session lookups backed by Redis with an in-process LRU in front."""
+
+    def __init__(self, redis: Redis, config: SessionStoreConfig):
+        self.redis = redis
+        self.config = config
+        self._local: OrderedDict[str, tuple[float, Session]] = OrderedDict()
+        self._pending: dict[str, datetime] = {}
+        self._flush_lock = Lock()
+        self._redis_failing = False
+
+    def _key(self, id: str) -> str:
+        return f"{self.config.redis_prefix}{id}"
+
+    def _remember(self, session: Session) -> None:
+        self._local[session.id] = (monotonic(), session)
+        self._local.move_to_end(session.id)
+        while len(self._local) > self.config.cache_size:
+            self._local.popitem(last=False)
+
+    def _redis_failed(self) -> None:
+        # Only the first error of an outage is printed, not one per request
+        if not self._redis_failing:
+            print_exc()
+        self._redis_failing = True
+
+    async def _store_remote(self, session: Session) -> None:
+        try:
+            await self.redis.set(
+                self._key(session.id),
+                session.model_dump_json(),
+                ex=self.config.redis_ttl,
+            )
+            self._redis_failing = False
+        except RedisError:
+            self._redis_failed()
+
+    async def _load_remote(self, id: str) -> Session | None:
+        try:
+            raw = await self.redis.get(self._key(id))
+            self._redis_failing = False
+        except RedisError:
+            self._redis_failed()
+            return None
+        return Session.model_validate_json(raw) if raw else None
+
+    async def get(self, id: str) -> Session | None:
+        cached = self._local.get(id, None)
+        if cached and monotonic() - cached[0] < self.config.local_ttl:
+            self._local.move_to_end(id)
+            return cached[1]
+
+        session = await self._load_remote(id)
+        if not session:
+            session = await Session.get(id)
+            if not session:
+                self._local.pop(id, None)
+                return None
+            await self._store_remote(session)
+
+        if id in self._pending.keys():
+            session.last_request = self._pending[id]
+        self._remember(session)
+        return session
+
+    def touch(self, session: Session) -> None:
+        session.last_request = datetime.now(UTC)
+        self._pending[session.id] = session.last_request
+
+    async def save(self, session: Session) -> Session:
+        await session.save()
+        self._pending.pop(session.id, None)
+        await self._store_remote(session)
+        self._remember(session)
+        return session
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            pending = self._pending
+            self._pending = {}
+            if len(pending) == 0:
+                return 0
+
+            try:
+                async with BulkWriter() as writer:
+                    for id, last_request in pending.items():
+                        await Session.find(Session.id == id).update(
+                            {"$set": {"last_request": last_request}},
+                            bulk_writer=writer,
+                        )
+            except:
+                for id, last_request in pending.items():
+                    self._pending.setdefault(id, last_request)
+                raise
+
+            return len(pending)
+
+    @asynccontextmanager
+    async def run(self):
+        async def flush_loop():
+            while True:
+                await sleep(self.config.flush_interval)
+                try:
+                    await self.flush()
+                except CancelledError:
+                    raise
+                except:
+                    print_exc()
+
+        task = create_task(flush_loop())
+        try:
+            yield self
+        finally:
+            task.cancel()
+            try:
+                await self.flush()
+            except Exception:
+                print_exc()
+
+
+async def provide_sessions(state: State) -> SessionStore:
+    return state.sessions
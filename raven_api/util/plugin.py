@@ -1,4 +1,19 @@
-from asyncio import Task, TaskGroup, create_task
+from asyncio import (
+    FIRST_EXCEPTION,
+    Event,
+    Future,
+    Lock as AsyncLock,
+    Task,
+    TaskGroup,
+    create_task,
+    get_running_loop,
+    shield,
+    to_thread,
+    wait,
+)
+from functools import partial
+from threading import Lock
+from time import perf_counter
 from contextlib import asynccontextmanager
 import json
 from logging import Logger
@@ -6,73 +21,297 @@ import os
 from traceback import print_exc
 from types import ModuleType
 from typing import Any, Callable, ItemsView, Literal, Type, TypedDict
-from h11 import Event
+from uuid import uuid4
 from litestar import Litestar
 from pydantic import BaseModel
 from ..common.plugin import (
     PluginManifest,
     LifecycleExport,
     LifecycleContext,
+    EventExport,
     EXPORTS,
     ResourceExport,
+    ExecutorExport,
     Resource,
     ExecutionManager,
     Executor,
     EVENT_TYPES,
     EVENTS,
+    ResourceUpdateEvent,
+    ResourceProperty,
     ResourceResolver,
 )
 from ..common.models import Config
+from .resource_cache import ResourceCache
+from .executor_cache import ExecutorCache
+from .plugin_calls import (
+    CallStatus,
+    CircuitOpenError,
+    ExecutionResult,
+    ExportGuard,
+    PluginCalls,
+    call_state,
+)
+from .resource_index import ResourceIndex, TargetList
+from .plugin_deps import DependencyInstaller
+from .startup import STARTUP
+from .events import WorkerLease
 import importlib.util
 import sys
-import subprocess
+
+
+class PluginModule:
+    """A plugin's entrypoint module, imported once, eagerly or in the background."""
+
+    def __init__(self, folder: str, manifest: PluginManifest, logger: Logger):
+        self.folder = folder
+        self.manifest = manifest
+        self.logger = logger
+        self.import_time: float | None = None
+        self._module: ModuleType | None = None
+        self._lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._module != None
+
+    def get(self) -> ModuleType:
+        if self._module != None:
+            return self._module
+
+        with self._lock:
+            if self._module == None:
+                started = perf_counter()
+                spec = importlib.util.spec_from_file_location(
+                    f"raven_plugins.{self.manifest.slug}",
+                    os.path.join("plugins", self.folder, self.manifest.entrypoint),
+                )
+                plugin_module = importlib.util.module_from_spec(spec)
+                sys.modules[f"raven_plugins.{self.manifest.slug}"] = plugin_module
+                try:
+                    spec.loader.exec_module(plugin_module)
+                except:
+                    del sys.modules[f"raven_plugins.{self.manifest.slug}"]
+                    raise
+                self.import_time = perf_counter() - started
+                STARTUP.record("import", self.manifest.slug, started, self.import_time)
+                self._module = plugin_module
+                self.logger.info(
+                    f"Imported plugin {self.manifest.slug} in {self.import_time * 1000:.1f}ms"
+                )
+        return self._module
+
+    async def load(self) -> ModuleType:
+        """Imports the module in a worker thread, unless it is already imported."""
+        if self._module != None:
+            return self._module
+        return await to_thread(self.get)
 
 
 class LifecycleRecord(TypedDict):
-    module: ModuleType
+    module: PluginModule
     plugin: PluginManifest
     export: LifecycleExport
     settings: dict
 
 
-@asynccontextmanager
-async def nest_lifecycle(context: LifecycleContext, lifecycles: list[LifecycleRecord]):
-    current = lifecycles[0]
-    remaining = lifecycles[1:]
+LifecycleKey = tuple[str, str]
 
-    current_export = current["export"].resolve(current["module"])
-    if current["export"].is_async:
-        async with current_export(current["settings"]) as current_context:
-            context.register(
-                current["plugin"].slug, current["export"].context_key, current_context
-            )
-            if len(remaining) > 0:
-                async with nest_lifecycle(context, remaining) as _:
-                    yield context
-            else:
-                yield context
-    else:
-        with current_export(current["settings"]) as current_context:
-            context.register(
-                current["plugin"].slug, current["export"].context_key, current_context
-            )
-            if len(remaining) > 0:
-                async with nest_lifecycle(context, remaining) as _:
-                    yield context
+
+class LifecycleRunner:
+    """Starts lifecycle exports in dependency order and stops them in reverse."""
+
+    def __init__(
+        self,
+        context: LifecycleContext,
+        lifecycles: list[LifecycleRecord],
+        logger: Logger,
+    ):
+        self.context = context
+        self.logger = logger
+        self.records: dict[LifecycleKey, LifecycleRecord] = {}
+        self.requires: dict[LifecycleKey, dict[str, LifecycleKey]] = {}
+        self._started: dict[LifecycleKey, Future[Any]] = {}
+        self._stop: dict[LifecycleKey, Event] = {}
+        self._holders: dict[LifecycleKey, Task] = {}
+        self.add(lifecycles)
+
+    def add(self, lifecycles: list[LifecycleRecord]) -> list[LifecycleKey]:
+        records = dict(self.records)
+        added: list[LifecycleKey] = []
+        for record in lifecycles:
+            key = (record["plugin"].slug, record["export"].context_key)
+            if key in records.keys():
+                raise ValueError(f"Duplicate context key detected: {key[0]}.{key[1]}")
+            records[key] = record
+            added.append(key)
+
+        requires = dict(self.requires)
+        for key in added:
+            requires[key] = records[key]["export"].requires(key[0])
+            for dependency in requires[key].values():
+                if not dependency in records.keys():
+                    raise ValueError(
+                        f"Lifecycle {key[0]}.{key[1]} depends on unknown context key {dependency[0]}.{dependency[1]}"
+                    )
+        self._check_cycles(requires)
+
+        self.records = records
+        self.requires = requires
+        return added
+
+    def dependents(self, plugin: str) -> list[LifecycleKey]:
+        """Lifecycles of other plugins that depend on this plugin's context keys."""
+        return [
+            key
+            for key, requires in self.requires.items()
+            if key[0] != plugin and any(i[0] == plugin for i in requires.values())
+        ]
+
+    @staticmethod
+    def _check_cycles(requires: dict[LifecycleKey, dict[str, LifecycleKey]]) -> None:
+        done: set[LifecycleKey] = set()
+        visiting: list[LifecycleKey] = []
+
+        def visit(key: LifecycleKey):
+            if key in done:
+                return
+            if key in visiting:
+                cycle = visiting[visiting.index(key) :] + [key]
+                raise ValueError(
+                    "Circular lifecycle dependency: "
+                    + " -> ".join(f"{i[0]}.{i[1]}" for i in cycle)
+                )
+            visiting.append(key)
+            for dependency in requires[key].values():
+                visit(dependency)
+            visiting.pop()
+            done.add(key)
+
+        for key in requires.keys():
+            visit(key)
+
+    async def _hold(self, key: LifecycleKey, kwargs: dict[str, Any]) -> None:
+        record = self.records[key]
+        started = self._started[key]
+        try:
+            module = await record["module"].load()
+            manager = record["export"].resolve(module)(record["settings"], **kwargs)
+            if record["export"].is_async:
+                async with manager as value:
+                    started.set_result(value)
+                    await self._stop[key].wait()
             else:
-                yield context
+                value = await to_thread(manager.__enter__)
+                started.set_result(value)
+                try:
+                    await self._stop[key].wait()
+                except BaseException as e:
+                    await to_thread(manager.__exit__, type(e), e, e.__traceback__)
+                    raise
+                await to_thread(manager.__exit__, None, None, None)
+        except BaseException as e:
+            if not started.done():
+                started.set_exception(e)
+                started.exception()
+            raise
+
+    async def _start(self, key: LifecycleKey) -> None:
+        kwargs = {
+            k: await shield(self._started[dependency])
+            for k, dependency in self.requires[key].items()
+        }
+        started_at = perf_counter()
+        self._holders[key] = create_task(self._hold(key, kwargs))
+        value = await shield(self._started[key])
+        self.context.register(key[0], key[1], value)
+        STARTUP.record("lifecycle", key[0], started_at, perf_counter() - started_at)
+        self.logger.info(
+            f"Started lifecycle {key[0]}.{key[1]} in {(perf_counter() - started_at) * 1000:.1f}ms"
+        )
+
+    async def _stop_one(self, key: LifecycleKey, stopping: set[LifecycleKey]) -> None:
+        dependents = [
+            self._holders[other]
+            for other, requires in self.requires.items()
+            if key in requires.values() and other in stopping
+        ]
+        if len(dependents) > 0:
+            await wait(dependents)
+
+        self._stop[key].set()
+        try:
+            await self._holders[key]
+        except Exception:
+            if self._started[key].done() and self._started[key].exception() == None:
+                print_exc()
+
+    async def start(self, keys: list[LifecycleKey] | None = None) -> None:
+        keys = (
+            [i for i in self.records.keys() if not i in self._started.keys()]
+            if keys == None
+            else keys
+        )
+        loop = get_running_loop()
+        for key in keys:
+            self._started[key] = loop.create_future()
+            self._stop[key] = Event()
+
+        started_at = perf_counter()
+        starters = [create_task(self._start(key)) for key in keys]
+        if len(starters) == 0:
+            return
+        done, pending = await wait(starters, return_when=FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if task.exception():
+                raise task.exception()
+        self.logger.info(
+            f"Started {len(keys)} lifecycle(s) in {(perf_counter() - started_at) * 1000:.1f}ms"
+        )
+
+    async def stop(self, keys: list[LifecycleKey] | None = None) -> None:
+        stopping = set(self._holders.keys() if keys == None else keys) & set(
+            self._holders.keys()
+        )
+        stoppers = [create_task(self._stop_one(key, stopping)) for key in stopping]
+        if len(stoppers) > 0:
+            await wait(stoppers)
+        for key in stopping:
+            del self._holders[key]
+
+    async def remove(self, plugin: str) -> None:
+        """Stops and forgets a plugin's lifecycles and unregisters its context keys."""
+        keys = [i for i in self.records.keys() if i[0] == plugin]
+        await self.stop(keys)
+        for key in keys:
+            for registry in (self.records, self.requires, self._started, self._stop):
+                registry.pop(key, None)
+        self.context.remove(plugin)
+
+    @asynccontextmanager
+    async def run(self):
+        try:
+            await self.start()
+            yield self.context
+        finally:
+            await self.stop()
 
 
 class PluginRecord(TypedDict):
     folder: str
     manifest: PluginManifest
-    module: ModuleType
+    module: PluginModule
 
 
 class Plugin:
     def __init__(self, record: PluginRecord, loader: "PluginLoader"):
         self._record = record
         self.loader = loader
+        self._constructors: dict[str, Callable[..., Any]] = {}
+        self._instances: dict[str, ResourceResolver | ExecutionManager] = {}
+        self._registry_built = False
 
     @property
     def folder(self) -> str:
@@ -84,7 +323,14 @@ class Plugin:
 
     @property
     def module(self) -> ModuleType:
-        return self._record["module"]
+        return self._record["module"].get()
+
+    @property
+    def import_time(self) -> float | None:
+        return self._record["module"].import_time
+
+    async def load_module(self) -> ModuleType:
+        return await self._record["module"].load()
 
     def exports(
         self, *types: Literal["resource", "lifecycle", "executor", "event"]
@@ -107,92 +353,225 @@ class Plugin:
                 return None
         return None
 
-    async def get_resources(self) -> list[Resource]:
+    def _instantiate(
+        self, export_key: str, export: ResourceExport | ExecutorExport
+    ) -> ResourceResolver | ExecutionManager:
+        kwargs = {
+            k: self.loader.lifecycle.get(self.manifest.slug, v)
+            for k, v in export.kwargs.items()
+        }
+        if export.type == "executor":
+            return self._constructors[export_key](export_key, **kwargs)
+        return self._constructors[export_key](**kwargs)
+
+    def build_registry(self) -> None:
+        """Resolves every resource & executor export once, after lifecycle startup."""
+        self._constructors = {}
+        self._instances = {}
+        self._registry_built = True
+        for export_key, export in self.exports("resource", "executor").items():
+            try:
+                self._constructors[export_key] = export.resolve(self.module)
+                if export.persistent:
+                    self._instances[export_key] = self._instantiate(export_key, export)
+            except:
+                print_exc()
+                self._constructors.pop(export_key, None)
+
+    def clear_registry(self) -> None:
+        self._constructors = {}
+        self._instances = {}
+        self._registry_built = False
+
+    def ensure_registry(self) -> None:
+        if not self._registry_built:
+            self.build_registry()
+
+    async def preload(self) -> None:
+        """Imports the module off the event loop, then builds the export registry."""
+        try:
+            await self.load_module()
+        except Exception:
+            print_exc()
+            return
+        self.ensure_registry()
+
+    def _get_instance(self, export_key: str):
+        """Returns the shared instance of a persistent export, else a new one."""
+        self.ensure_registry()
+        if export_key in self._instances.keys():
+            return self._instances[export_key]
+        if export_key in self._constructors.keys():
+            return self._instantiate(export_key, self.get_export(export_key))
+        return None
+
+    def make_resolver(
+        self, export_key: str, export: ResourceExport
+    ) -> ResourceResolver | None:
+        return self._get_instance(export_key)
+
+    def _try_resolver(
+        self, export_key: str, export: ResourceExport
+    ) -> ResourceResolver | None:
+        try:
+            return self.make_resolver(export_key, export)
+        except Exception:
+            print_exc()
+            return None
+
+    def guard(self, export_key: str) -> ExportGuard:
+        return self.loader.calls.guard(
+            self.manifest.slug, export_key, self.get_export(export_key)
+        )
+
+    def _record_failure(
+        self, status: CallStatus, export_key: str, error: Exception
+    ) -> None:
+        if not isinstance(error, (TimeoutError, CircuitOpenError)):
+            print_exc()
+        status.record(export_key, error)
+
+    async def get_resources(self, status: CallStatus | None = None) -> list[Resource]:
+        """Resources from every resource export; failures are recorded in `status`."""
+        status = CallStatus() if status == None else status
+        started = perf_counter()
         resource_exports: dict[str, ResourceExport] = self.exports("resource")
         results = []
         for export_key, export in resource_exports.items():
-            resource_resolver = self.resolve_export(
-                export_key, _exported=Type[ResourceResolver]
-            )
-            if resource_resolver:
-                kwargs = {
-                    k: self.loader.lifecycle.get(self.manifest.slug, v)
-                    for k, v in export.kwargs.items()
-                }
-                results.extend(await resource_resolver(**kwargs).get_all())
+            guard = self.guard(export_key)
+            try:
+                resolver = self.make_resolver(export_key, export)
+                if resolver:
+                    results.extend(
+                        await self.loader.resource_cache.get_all(
+                            self.manifest.slug,
+                            export_key,
+                            partial(guard.call, resolver.get_all),
+                            partial(guard.call, resolver.get_one),
+                        )
+                    )
+            except Exception as e:
+                self._record_failure(status, export_key, e)
+
+        status.elapsed += perf_counter() - started
         return results
 
+    async def index_resources(
+        self, index: ResourceIndex | None = None, status: CallStatus | None = None
+    ) -> None:
+        """Brings this plugin's entries in the resource index up to date."""
+        status = CallStatus() if status == None else status
+        resource_exports: dict[str, ResourceExport] = self.exports("resource")
+        for export_key, export in resource_exports.items():
+            guard = self.guard(export_key)
+            try:
+                resolver = self.make_resolver(export_key, export)
+                if resolver == None:
+                    continue
+                if index == None:
+                    await self.loader.resource_cache.ensure(
+                        self.manifest.slug,
+                        export_key,
+                        partial(guard.call, resolver.get_all),
+                        partial(guard.call, resolver.get_one),
+                    )
+                else:
+                    for resource in await guard.call(resolver.get_all):
+                        index.add(self.manifest.slug, export_key, resource)
+            except Exception as e:
+                self._record_failure(status, export_key, e)
+
+    async def resolve_resource(self, id: str) -> tuple[str, Resource] | None:
+        """Fetches a resource from the plugin directly, bypassing the resource cache."""
+        resource_exports: dict[str, ResourceExport] = self.exports("resource")
+        for export_key, export in resource_exports.items():
+            resolver = self._try_resolver(export_key, export)
+            if resolver:
+                found = await self.guard(export_key).call(resolver.get_one, id)
+                if found:
+                    return export_key, found
+        return None
+
     async def get_resource(self, id: str) -> Resource | None:
         resource_exports: dict[str, ResourceExport] = self.exports("resource")
         for export_key, export in resource_exports.items():
-            resource_resolver = self.resolve_export(
-                export_key, _exported=Type[ResourceResolver]
-            )
-            if resource_resolver:
-                kwargs = {
-                    k: self.loader.lifecycle.get(self.manifest.slug, v)
-                    for k, v in export.kwargs.items()
-                }
-                found = await resource_resolver(**kwargs).get_one(id)
+            resolver = self._try_resolver(export_key, export)
+            if resolver:
+                found = await self.loader.resource_cache.get_one(
+                    self.manifest.slug,
+                    export_key,
+                    id,
+                    partial(self.guard(export_key).call, resolver.get_one),
+                )
                 if found:
                     return found
 
         return None
 
     @property
-    def execution_managers(self) -> list[ExecutionManager]:
-        constructors: dict[str, Type[ExecutionManager]] = {
-            export: self.resolve_export(export, _exported=ExecutionManager)
+    def executor_exports(self) -> list[str]:
+        self.ensure_registry()
+        return [
+            export
             for export in self.exports("executor").keys()
-        }
+            if export in self._constructors.keys()
+        ]
 
-        result = []
-        for export, constructor in constructors.items():
-            kwargs = {
-                k: self.loader.lifecycle.get(self.manifest.slug, v)
-                for k, v in self.manifest.exports.get(export).kwargs.items()
-            }
-            result.append(constructor(export, **kwargs))
-        return result
+    def get_manager(self, export: str) -> ExecutionManager | None:
+        if self.get_export(export) and self.get_export(export).type == "executor":
+            return self._get_instance(export)
+        return None
 
     async def get_executors_for_resources(
-        self, targets: list[Resource]
+        self, targets: list[Resource], status: CallStatus | None = None
     ) -> list[Executor]:
+        status = CallStatus() if status == None else status
+        started = perf_counter()
         tasks: list[Task] = []
 
         async def exec_one(
-            manager: ExecutionManager, targets: list[Resource]
-        ) -> list[Executor]:
+            export: str, targets: list[Resource]
+        ) -> list[Executor] | None:
             try:
-                return await manager.get_executors(targets)
-            except:
-                print_exc()
-                return []
+                manager = self._get_instance(export)
+                return await self.guard(export).call(manager.get_executors, targets)
+            except Exception as e:
+                self._record_failure(status, export, e)
+                return None
 
-        async with TaskGroup() as group:
-            for manager in self.execution_managers:
-                tasks.append(group.create_task(exec_one(manager, targets)))
+        async def discover() -> tuple[list[Executor], bool]:
+            async with TaskGroup() as group:
+                for export in self.executor_exports:
+                    tasks.append(group.create_task(exec_one(export, targets)))
 
-        results = []
-        for task in tasks:
-            results.extend(task.result())
+            results = []
+            for task in tasks:
+                results.extend(task.result() or [])
 
-        return results
+            return results, all([task.result() != None for task in tasks])
+
+        try:
+            return await self.loader.executor_cache.get(
+                self.manifest.slug, targets, discover
+            )
+        finally:
+            status.elapsed += perf_counter() - started
 
     async def get_possible_executor_targets(self, executor: Executor) -> list[Resource]:
         tasks: list[Task] = []
 
-        async def exec_one(
-            manager: ExecutionManager, executor: Executor
-        ) -> list[Resource]:
+        async def exec_one(export: str, executor: Executor) -> list[Resource]:
             try:
-                return await manager.get_available_targets(executor)
-            except:
+                manager = self._get_instance(export)
+                return await self.guard(export).call(
+                    manager.get_available_targets, executor
+                )
+            except Exception:
                 return []
 
         async with TaskGroup() as group:
-            for manager in self.execution_managers:
-                tasks.append(group.create_task(exec_one(manager, executor)))
+            for export in self.executor_exports:
+                tasks.append(group.create_task(exec_one(export, executor)))
 
         results = []
         for task in tasks:
@@ -205,34 +584,32 @@ class Plugin:
         executor: Executor,
         arguments: dict[str, Any],
         target: Resource,
-    ) -> None:
-        for manager in self.execution_managers:
-            if manager.export == executor.export:
-                try:
-                    return await manager.execute(executor, arguments, target)
-                except:
-                    return None
+    ) -> Resource | None:
+        """Runs an executor through its export's guard; errors propagate."""
+        manager = self.get_manager(executor.export)
+        if manager:
+            return await self.guard(executor.export).call(
+                manager.execute, executor, arguments, target
+            )
         return None
 
+    async def _listen(self, app: Litestar, export_key: str, export: EventExport):
+        await self.load_module()
+        listener = self.resolve_export(export_key)
+        kwargs = {
+            k: self.loader.lifecycle.get(self.manifest.slug, v)
+            for k, v in export.kwargs.items()
+        }
+        await listener(
+            emit=EVENTS.make_emitter(app, source=self.manifest.slug + ":" + export_key),
+            **kwargs,
+        )
+
     async def activate_listeners(self, app: Litestar) -> list[Task]:
         listeners = self.exports("event")
         tasks = []
         for export_key, export in listeners.items():
-            listener = self.resolve_export(export_key)
-            kwargs = {
-                k: self.loader.lifecycle.get(self.manifest.slug, v)
-                for k, v in export.kwargs.items()
-            }
-            tasks.append(
-                create_task(
-                    listener(
-                        emit=EVENTS.make_emitter(
-                            app, source=self.manifest.slug + ":" + export_key
-                        ),
-                        **kwargs,
-                    )
-                )
-            )
+            tasks.append(create_task(self._listen(app, export_key, export)))
 
         return tasks
 
@@ -242,18 +619,40 @@ class PluginLoader:
     def __init__(self, config: Config, logger: Logger):
         self.config = config
         self.logger = logger
+        self.worker_id = uuid4().hex
         self.lifecycle = LifecycleContext()
+        self.resource_cache = ResourceCache(config.cache.resources)
+        self.executor_cache = ExecutorCache(config.cache.executors)
+        self.calls = PluginCalls(config.calls)
+        self._runner: LifecycleRunner | None = None
+        self._listeners: dict[str, list[Task]] = {}
+        self._listening = False
+        self._app: Litestar | None = None
+        self._reloading = AsyncLock()
+        self._updating: dict[tuple[str, str], ResourceUpdateEvent | None] = {}
+        self._update_tasks: set[Task] = set()
         self._plugins = self._load_plugins()
+        self._wrappers = {k: Plugin(v, self) for k, v in self._plugins.items()}
 
     @property
     def manifests(self) -> list[PluginManifest]:
         return [i["manifest"] for i in self._plugins.values()]
 
-    def _load_plugins(self) -> dict[str, PluginRecord]:
-        self.logger.info("Loading plugins...")
-        manifests: dict[str, PluginRecord] = {}
+    @classmethod
+    async def load(cls, config: Config, logger: Logger) -> "PluginLoader":
+        """Installs changed plugin dependencies (if enabled), then loads the plugins."""
+        if config.dev.plugin_dep_install:
+            with STARTUP.phase("plugins.dependencies"):
+                await DependencyInstaller(config.dev, logger).install(
+                    [i[1] for i in cls._read_manifests(logger)]
+                )
+        return cls(config, logger)
+
+    @staticmethod
+    def _read_manifests(logger: Logger) -> list[tuple[str, PluginManifest]]:
+        manifests: list[tuple[str, PluginManifest]] = []
         for folder in os.listdir("plugins"):
-            self.logger.debug(f"Checking folder {folder}")
+            logger.debug(f"Checking folder {folder}")
             if os.path.isdir(os.path.join("plugins", folder)):
                 if os.path.exists(os.path.join("plugins", folder, "manifest.json")):
                     try:
@@ -266,61 +665,333 @@ class PluginLoader:
                             f"Failed to load plugin manifest in folder {folder}"
                         )
 
-                    self.logger.debug(f"Loaded plugin manifest for {manifest.slug}")
-
-                    if self.config.dev.plugin_dep_install:
-                        deps = [i.ref for i in manifest.dependencies]
-                        self.logger.debug(
-                            f"Installing plugin dependencies: [{', '.join(deps)}]"
-                        )
-                        subprocess.run(
-                            [sys.executable, "-m", "pip", "install", *deps],
-                            check=True,
-                            capture_output=True,
-                        )
+                    logger.debug(f"Loaded plugin manifest for {manifest.slug}")
+                    manifests.append((folder, manifest))
+        return manifests
 
-                    spec = importlib.util.spec_from_file_location(
-                        f"raven_plugins.{manifest.slug}",
-                        os.path.join("plugins", folder, manifest.entrypoint),
-                    )
-                    plugin_module = importlib.util.module_from_spec(spec)
-                    sys.modules[f"raven_plugins.{manifest.slug}"] = plugin_module
-                    spec.loader.exec_module(plugin_module)
-                    manifests[manifest.slug] = {
-                        "module": plugin_module,
-                        "folder": folder,
-                        "manifest": manifest,
-                    }
+    def _load_plugins(self) -> dict[str, PluginRecord]:
+        self.logger.info("Loading plugins...")
+        manifests: dict[str, PluginRecord] = {}
+        with STARTUP.phase("plugins.discovery"):
+            discovered = self._read_manifests(self.logger)
+        with STARTUP.phase("plugins.import"):
+            for folder, manifest in discovered:
+                plugin_module = PluginModule(folder, manifest, self.logger)
+                if not self.config.dev.plugin_lazy_import:
+                    plugin_module.get()
+                manifests[manifest.slug] = {
+                    "module": plugin_module,
+                    "folder": folder,
+                    "manifest": manifest,
+                }
 
         return manifests
 
+    def _lifecycle_records(self, plugin: PluginRecord) -> list[LifecycleRecord]:
+        return [
+            {
+                "export": export,
+                "module": plugin["module"],
+                "plugin": plugin["manifest"],
+                "settings": self.config.plugins.get(plugin["manifest"].slug, {}),
+            }
+            for export in plugin["manifest"].exports.values()
+            if export.type == "lifecycle"
+        ]
+
     @asynccontextmanager
     async def resolve_lifecycle(self):
         lifecycle_records: list[LifecycleRecord] = []
         for plugin in self._plugins.values():
-            for export in plugin["manifest"].exports.values():
-                if export.type == "lifecycle":
-                    lifecycle_records.append(
-                        {
-                            "export": export,
-                            "module": plugin["module"],
-                            "plugin": plugin["manifest"],
-                            "settings": self.config.plugins.get(
-                                plugin["manifest"].slug, {}
-                            ),
-                        }
+            lifecycle_records.extend(self._lifecycle_records(plugin))
+
+        self._runner = LifecycleRunner(self.lifecycle, lifecycle_records, self.logger)
+        async with self._runner.run() as context:
+            preloading: list[Task] = []
+            for plugin in self._wrappers.values():
+                if self._plugins[plugin.manifest.slug]["module"].loaded:
+                    plugin.build_registry()
+                else:
+                    preloading.append(create_task(plugin.preload()))
+            try:
+                yield context
+            finally:
+                for task in preloading:
+                    task.cancel()
+                for plugin in self._wrappers.values():
+                    plugin.clear_registry()
+                self._runner = None
+
+    async def reload(self, slug: str) -> Plugin:
+        """Reloads one plugin's manifest, module, lifecycles and listeners in place."""
+        async with self._reloading:
+            found = [i for i in self._read_manifests(self.logger) if i[1].slug == slug]
+            if len(found) == 0:
+                raise KeyError(f"No plugin folder contains {slug}")
+            folder, manifest = found[0]
+            if self._runner:
+                dependents = self._runner.dependents(slug)
+                if len(dependents) > 0:
+                    raise ValueError(
+                        f"Cannot reload {slug}, lifecycles depend on it: {', '.join(f'{i[0]}.{i[1]}' for i in dependents)}"
                     )
 
-        async with nest_lifecycle(self.lifecycle, lifecycle_records) as context:
-            yield context
+            if self.config.dev.plugin_dep_install:
+                await DependencyInstaller(self.config.dev, self.logger).install(
+                    [manifest]
+                )
+
+            name = f"raven_plugins.{slug}"
+            previous = {
+                k: v
+                for k, v in sys.modules.items()
+                if k == name or k.startswith(name + ".")
+            }
+            for key in previous.keys():
+                del sys.modules[key]
+            module = PluginModule(folder, manifest, self.logger)
+            try:
+                await module.load()
+            except:
+                sys.modules.update(previous)
+                raise
+
+            listeners = self._listeners.pop(slug, [])
+            for task in listeners:
+                task.cancel()
+            if len(listeners) > 0:
+                await wait(listeners)
+            if slug in self._wrappers.keys():
+                self._wrappers[slug].clear_registry()
+            if self._runner:
+                await self._runner.remove(slug)
+            self.calls.reset(slug)
+            self.executor_cache.invalidate(slug)
+            self.resource_cache.invalidate(slug)
+
+            record: PluginRecord = {
+                "module": module,
+                "folder": folder,
+                "manifest": manifest,
+            }
+            self._plugins[slug] = record
+            self._wrappers[slug] = Plugin(record, self)
+            try:
+                if self._runner:
+                    await self._runner.start(
+                        self._runner.add(self._lifecycle_records(record))
+                    )
+                # Persistent exports can use lifecycle context, so the registry is
+                # built after startup, and the lifecycles are stopped if it fails.
+                self._wrappers[slug].build_registry()
+            except:
+                self._wrappers[slug].clear_registry()
+                if self._runner:
+                    await self._runner.remove(slug)
+                raise
+            if self._app and self._listening:
+                self._listeners[slug] = await self._wrappers[slug].activate_listeners(
+                    self._app
+                )
+
+            self.logger.info(f"Reloaded plugin {slug}")
+            return self._wrappers[slug]
+
+    @property
+    def import_times(self) -> dict[str, float | None]:
+        return {k: v["module"].import_time for k, v in self._plugins.items()}
 
     @property
     def plugins(self) -> dict[str, Plugin]:
-        return {k: Plugin(v, self) for k, v in self._plugins.items()}
+        return self._wrappers
+
+    async def resolve_update(
+        self, event: ResourceUpdateEvent
+    ) -> ResourceUpdateEvent | None:
+        """Fills in what changed for a resource.update event, or None if nothing did."""
+        slug = event.source.split(":")[0]
+        plugin = self.get(slug)
+        if not plugin:
+            return event
+
+        previous = self.resource_cache.peek(slug, event.entity_id)
+        current = await plugin.resolve_resource(event.entity_id)
+        if not current:
+            self.resource_cache.remove(slug, event.entity_id)
+            return event.model_copy(update={"deleted": True})
+
+        export, resource = current
+        self.resource_cache.put(slug, export, resource)
+        if not previous:
+            return event.model_copy(
+                update={
+                    "changes": resource.properties,
+                    "metadata": resource.metadata,
+                    "state_key": resource.state_key,
+                }
+            )
+
+        old = previous[1]
+        changes: dict[str, ResourceProperty | None] = {
+            k: v
+            for k, v in resource.properties.items()
+            if not k in old.properties.keys()
+            or old.properties[k].model_dump() != v.model_dump()
+        }
+        for k in old.properties.keys():
+            if not k in resource.properties.keys():
+                changes[k] = None
+        metadata_changed = old.metadata.model_dump() != resource.metadata.model_dump()
+        state_changed = old.state_key != resource.state_key
+
+        if len(changes) == 0 and not metadata_changed and not state_changed:
+            return None
+        return event.model_copy(
+            update={
+                "changes": changes,
+                "metadata": resource.metadata if metadata_changed else None,
+                "state_key": resource.state_key if state_changed else None,
+            }
+        )
+
+    def schedule_update(
+        self,
+        event: ResourceUpdateEvent,
+        publish: Callable[[ResourceUpdateEvent], None],
+    ) -> None:
+        """Resolves a resource.update event in the background, one task per entity."""
+        key = (event.source, event.entity_id)
+        if key in self._updating.keys():
+            self._updating[key] = event
+            return
+
+        self._updating[key] = None
+        task = create_task(self._resolve_updates(key, event, publish))
+        self._update_tasks.add(task)
+        task.add_done_callback(self._update_tasks.discard)
+
+    async def _resolve_updates(
+        self,
+        key: tuple[str, str],
+        event: ResourceUpdateEvent | None,
+        publish: Callable[[ResourceUpdateEvent], None],
+    ) -> None:
+        try:
+            while event:
+                try:
+                    resolved = await self.resolve_update(event)
+                except (TimeoutError, CircuitOpenError) as e:
+                    self.logger.warning(
+                        f"Could not resolve update of {event.entity_id} from {event.source}: {type(e).__name__}"
+                    )
+                    resolved = event
+                except Exception:
+                    print_exc()
+                    resolved = event
+
+                try:
+                    if resolved:
+                        publish(resolved)
+                except Exception:
+                    print_exc()
+                event = self._updating[key]
+                self._updating[key] = None
+        finally:
+            del self._updating[key]
+
+    def handle_event(self, event: EVENT_TYPES) -> None:
+        if isinstance(event, ResourceUpdateEvent):
+            self.executor_cache.touch(event.entity_id)
+        elif event.source != "core":
+            self.executor_cache.invalidate(event.source.split(":")[0])
+
+        if isinstance(event, ResourceUpdateEvent) and event.source != "core":
+            slug = event.source.split(":")[0]
+            if event.deleted:
+                self.resource_cache.remove(slug, event.entity_id)
+            elif event.changes != None:
+                cached = self.resource_cache.peek(slug, event.entity_id)
+                if cached:
+                    export, resource = cached
+                    properties = {**resource.properties, **event.changes}
+                    self.resource_cache.put(
+                        slug,
+                        export,
+                        resource.model_copy(
+                            update={
+                                "properties": {
+                                    k: v for k, v in properties.items() if v != None
+                                },
+                                "metadata": event.metadata or resource.metadata,
+                                "state_key": event.state_key or resource.state_key,
+                            }
+                        ),
+                    )
+                else:
+                    self.resource_cache.mark_stale(slug, event.entity_id)
+            else:
+                self.resource_cache.mark_stale(slug, event.entity_id)
+
+    async def execute(
+        self, executor: Executor, arguments: dict[str, Any], target: Resource
+    ) -> ExecutionResult:
+        """Runs one executor call, reporting failures in the result instead of raising."""
+        result = ExecutionResult(
+            plugin=executor.plugin, executor=executor.id, target=target.id
+        )
+        plugin = self.get(executor.plugin)
+        if not plugin or not plugin.get_manager(executor.export):
+            result.status = "not_found"
+            return result
+
+        started = perf_counter()
+        try:
+            result.result = await plugin.call_executor(executor, arguments, target)
+        except Exception as e:
+            if not isinstance(e, (TimeoutError, CircuitOpenError)):
+                print_exc()
+            result.status = call_state(e)
+            result.error = str(e) or type(e).__name__
+        result.elapsed = perf_counter() - started
+        return result
+
+    async def execute_many(
+        self, calls: list[tuple[Executor, dict[str, Any], Resource]]
+    ) -> list[ExecutionResult]:
+        """Runs executor calls concurrently within the plugin's bulk limit, in order."""
+
+        async def execute_one(
+            executor: Executor, arguments: dict[str, Any], target: Resource
+        ) -> ExecutionResult:
+            async with self.calls.bulk_limit(executor.plugin):
+                return await self.execute(executor, arguments, target)
+
+        tasks: list[Task[ExecutionResult]] = []
+        async with TaskGroup() as group:
+            for executor, arguments, target in calls:
+                tasks.append(
+                    group.create_task(execute_one(executor, arguments, target))
+                )
+        return [task.result() for task in tasks]
+
+    async def query_resources(
+        self, targets: TargetList, statuses: dict[str, CallStatus]
+    ) -> list[Resource]:
+        """Resources of the plugins in `statuses` matching `targets`."""
+        index = None if self.resource_cache.config.enabled else ResourceIndex()
+        async with TaskGroup() as group:
+            for slug, status in statuses.items():
+                if slug in self._wrappers.keys():
+                    group.create_task(
+                        self._wrappers[slug].index_resources(index, status)
+                    )
+
+        return (index or self.resource_cache.index).select(
+            targets, list(statuses.keys())
+        )
 
     def get(self, key: str) -> Plugin | None:
-        record = self._plugins.get(key, None)
-        return Plugin(record, self) if record else None
+        return self._wrappers.get(key, None)
 
     def items(self) -> ItemsView[str, Plugin]:
         return self.plugins.items()
@@ -328,14 +999,33 @@ class PluginLoader:
     def keys(self) -> list[str]:
         return list(self._plugins.keys())
 
-    @asynccontextmanager
-    async def event_listeners(self, app: Litestar):
-        tasks: list[Task] = []
-        for plugin in self.plugins.values():
-            tasks.extend(await plugin.activate_listeners(app))
+    async def _start_listeners(self) -> None:
+        self._listening = True
+        for key, plugin in self.plugins.items():
+            self._listeners[key] = await plugin.activate_listeners(self._app)
+
+    async def _stop_listeners(self) -> None:
+        self._listening = False
+        tasks = [task for tasks in self._listeners.values() for task in tasks]
+        self._listeners = {}
+        for task in tasks:
+            task.cancel()
+        if len(tasks) > 0:
+            await wait(tasks)
 
+    @asynccontextmanager
+    async def event_listeners(self, app: Litestar, lease: WorkerLease | None = None):
+        """Runs every plugin's event listeners, only while holding `lease` if given."""
+        self._app = app
         try:
-            yield
+            if lease == None:
+                await self._start_listeners()
+                yield
+            else:
+                async with lease.run(self._start_listeners, self._stop_listeners):
+                    yield
         finally:
-            for task in tasks:
+            await self._stop_listeners()
+            for task in list(self._update_tasks):
                 task.cancel()
+            self._app = None
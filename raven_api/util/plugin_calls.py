@@ -0,0 +1,161 @@
+from asyncio import Semaphore, timeout as call_timeout
+from time import monotonic
+from typing import Any, Awaitable, Callable, Literal
+from pydantic import BaseModel
+from ..common.plugin import ResourceExport, ExecutorExport, Resource
+from ..common.models.config import PluginCallsConfig
+
+CallState = Literal["ok", "timeout", "error", "unavailable"]
+_SEVERITY: list[CallState] = ["ok", "error", "timeout", "unavailable"]
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an export whose circuit breaker is open."""
+
+
+def call_state(error: BaseException) -> CallState:
+    if isinstance(error, CircuitOpenError):
+        return "unavailable"
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    return "error"
+
+
+class CallStatus(BaseModel):
+    status: CallState = "ok"
+    elapsed: float = 0.0
+    errors: dict[str, str] = {}
+
+    def record(self, export: str, error: BaseException) -> None:
+        state = call_state(error)
+        if _SEVERITY.index(state) > _SEVERITY.index(self.status):
+            self.status = state
+        self.errors[export] = str(error) or type(error).__name__
+
+
+class ExecutionResult(BaseModel):
+    plugin: str
+    executor: str
+    target: str
+    status: CallState | Literal["forbidden", "not_found"] = "ok"
+    elapsed: float = 0.0
+    result: Resource | None = None
+    error: str | None = None
+
+
+class ExportGuard:
+    """Timeout, concurrency limit and circuit breaker for one plugin export."""
+
+    def __init__(
+        self,
+        timeout: float | None,
+        max_concurrent: int | None,
+        threshold: int,
+        cooldown: float,
+    ):
+        self.timeout = timeout
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until: float | None = None
+        self._probing = False
+        self._limit = Semaphore(max_concurrent) if max_concurrent else None
+
+    @property
+    def state(self) -> Literal["closed", "open", "half_open"]:
+        if self.open_until == None:
+            return "closed"
+        if monotonic() < self.open_until:
+            return "open"
+        return "half_open"
+
+    async def _run[T](self, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+        if self.timeout == None:
+            return await func(*args)
+        async with call_timeout(self.timeout):
+            return await func(*args)
+
+    async def call[T](self, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+        state = self.state
+        if state == "open" or (state == "half_open" and self._probing):
+            raise CircuitOpenError("Circuit open after repeated timeouts")
+
+        probe = state == "half_open"
+        if probe:
+            self._probing = True
+        try:
+            if self._limit:
+                async with self._limit:
+                    result = await self._run(func, *args)
+            else:
+                result = await self._run(func, *args)
+        except TimeoutError:
+            self.failures += 1
+            if probe or self.failures >= self.threshold:
+                self.open_until = monotonic() + self.cooldown
+            raise
+        except Exception:
+            if probe:
+                self.open_until = monotonic() + self.cooldown
+            raise
+        finally:
+            if probe:
+                self._probing = False
+
+        self.failures = 0
+        self.open_until = None
+        return result
+
+
+class PluginCalls:
+    """Holds an ExportGuard per called export and each plugin's bulk limit."""
+
+    def __init__(self, config: PluginCallsConfig):
+        self.config = config
+        self._guards: dict[tuple[str, str], ExportGuard] = {}
+        self._bulk_limits: dict[str, Semaphore] = {}
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {
+            f"{plugin}.{export}": {
+                "state": guard.state,
+                "failures": guard.failures,
+                "timeout": guard.timeout,
+            }
+            for (plugin, export), guard in self._guards.items()
+        }
+
+    def _setting(
+        self, plugin: str, export_key: str, export: ResourceExport | ExecutorExport, key
+    ):
+        for override in (f"{plugin}.{export_key}", plugin):
+            if override in self.config.exports.keys():
+                value = getattr(self.config.exports[override], key)
+                if value != None:
+                    return value
+        value = getattr(export, key)
+        return value if value != None else getattr(self.config, key)
+
+    def guard(
+        self, plugin: str, export_key: str, export: ResourceExport | ExecutorExport
+    ) -> ExportGuard:
+        key = (plugin, export_key)
+        if not key in self._guards.keys():
+            self._guards[key] = ExportGuard(
+                self._setting(plugin, export_key, export, "timeout"),
+                self._setting(plugin, export_key, export, "max_concurrent"),
+                self.config.breaker_threshold,
+                self.config.breaker_cooldown,
+            )
+        return self._guards[key]
+
+    def bulk_limit(self, plugin: str) -> Semaphore:
+        if not plugin in self._bulk_limits.keys():
+            self._bulk_limits[plugin] = Semaphore(max(self.config.bulk_concurrency, 1))
+        return self._bulk_limits[plugin]
+
+    def reset(self, plugin: str | None = None) -> None:
+        for key in list(self._guards.keys()):
+            if plugin == None or key[0] == plugin:
+                del self._guards[key]
@@ -0,0 +1,91 @@
+from asyncio import create_subprocess_exec
+from asyncio.subprocess import PIPE
+from hashlib import sha256
+import json
+from logging import Logger
+import os
+from subprocess import CalledProcessError
+import sys
+import sysconfig
+from time import perf_counter
+from ..common.plugin import PluginManifest
+from ..common.models.config import DevConfig
+from .startup import STARTUP
+
+
+def dependency_fingerprint(manifest: PluginManifest) -> str:
+    """Hash of a plugin's dependency list and the interpreter it is installed for."""
+    return sha256(
+        json.dumps(
+            {
+                "interpreter": sys.executable,
+                "version": sys.version,
+                "dependencies": [i.model_dump() for i in manifest.dependencies],
+            },
+            sort_keys=True,
+        ).encode()
+    ).hexdigest()
+
+
+class DependencyInstaller:
+    """Installs plugin dependencies whose fingerprint changed since the last run."""
+
+    def __init__(self, config: DevConfig, logger: Logger):
+        self.logger = logger
+        self.path = (
+            config.plugin_dep_fingerprints
+            if config.plugin_dep_fingerprints
+            else os.path.join(
+                sysconfig.get_paths()["purelib"], ".raven_plugin_deps.json"
+            )
+        )
+
+    def _read(self) -> dict[str, str]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except:
+            return {}
+
+    def _write(self, fingerprints: dict[str, str]) -> None:
+        try:
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(fingerprints, f, indent=4)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError:
+            self.logger.warning(
+                f"Failed to write plugin dependency fingerprints to {self.path}"
+            )
+
+    async def _install(self, manifests: list[PluginManifest]) -> None:
+        deps = [i.ref for manifest in manifests for i in manifest.dependencies]
+        slugs = ", ".join(i.slug for i in manifests)
+        self.logger.debug(f"Installing dependencies for {slugs}: [{', '.join(deps)}]")
+        started = perf_counter()
+        command = [sys.executable, "-m", "pip", "install", *deps]
+        process = await create_subprocess_exec(*command, stdout=PIPE, stderr=PIPE)
+        stdout, stderr = await process.communicate()
+        elapsed = perf_counter() - started
+        for manifest in manifests:
+            STARTUP.record("dependencies", manifest.slug, started, elapsed)
+        if process.returncode != 0:
+            raise CalledProcessError(process.returncode, command, stdout, stderr)
+        self.logger.info(f"Installed dependencies for {slugs} in {elapsed:.1f}s")
+
+    async def install(self, manifests: list[PluginManifest]) -> None:
+        """Installs the dependencies of every changed plugin in one pip call."""
+        stored = self._read()
+        fingerprints = {i.slug: dependency_fingerprint(i) for i in manifests}
+        changed = [
+            i
+            for i in manifests
+            if len(i.dependencies) > 0 and stored.get(i.slug) != fingerprints[i.slug]
+        ]
+        if len(changed) == 0:
+            self.logger.debug("Plugin dependencies are up to date")
+            return
+
+        await self._install(changed)
+        for manifest in changed:
+            stored[manifest.slug] = fingerprints[manifest.slug]
+        self._write(stored)
@@ -0,0 +1,182 @@
+from asyncio import Lock, gather
+from collections import OrderedDict
+from time import monotonic
+from typing import Awaitable, Callable
+from ..common.plugin import Resource
+from ..common.models.config import ResourceCacheConfig
+from .resource_index import ResourceIndex
+
+FetchAll = Callable[[], Awaitable[list[Resource]]]
+FetchOne = Callable[[str], Awaitable[Resource | None]]
+
+
+class ResourceSnapshot:
+    def __init__(
+        self, plugin: str, export: str, resources: list[Resource], index: ResourceIndex
+    ):
+        self.plugin = plugin
+        self.export = export
+        self.index = index
+        self.resources: dict[str, Resource] = {}
+        self.stale: set[str] = set()
+        self.created = monotonic()
+        self.index.clear(plugin, export)
+        for resource in resources:
+            self.set(resource)
+
+    def set(self, resource: Resource) -> None:
+        self.resources[resource.id] = resource
+        self.index.add(self.plugin, self.export, resource)
+
+    def discard(self, id: str) -> None:
+        self.resources.pop(id, None)
+        self.index.remove(self.plugin, self.export, id)
+
+    def expired(self, max_age: float | None) -> bool:
+        if max_age == None:
+            return False
+        return monotonic() - self.created > max_age
+
+    async def refresh_stale(self, fetch_one: FetchOne) -> None:
+        if len(self.stale) == 0:
+            return
+
+        pending = list(self.stale)
+        self.stale.clear()
+        results = await gather(*[fetch_one(i) for i in pending], return_exceptions=True)
+        for entity_id, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                self.stale.add(entity_id)
+            elif result == None:
+                self.discard(entity_id)
+            else:
+                self.set(result)
+
+
+class ResourceCache:
+    """In-memory snapshots of each plugin's resource exports."""
+
+    def __init__(self, config: ResourceCacheConfig):
+        self.config = config
+        self.hits = 0
+        self.misses = 0
+        self._snapshots: dict[tuple[str, str], ResourceSnapshot] = {}
+        self._locks: dict[tuple[str, str], Lock] = {}
+        self._recent: OrderedDict[tuple[str, str], tuple[str, Resource]] = OrderedDict()
+        self.index = ResourceIndex()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "snapshots": len(self._snapshots),
+            "indexed": len(self.index),
+            "recent": len(self._recent),
+        }
+
+    def _lock(self, key: tuple[str, str]) -> Lock:
+        if not key in self._locks.keys():
+            self._locks[key] = Lock()
+        return self._locks[key]
+
+    def _fresh(self, key: tuple[str, str]) -> ResourceSnapshot | None:
+        snapshot = self._snapshots.get(key, None)
+        if snapshot and not snapshot.expired(self.config.max_age):
+            return snapshot
+        return None
+
+    async def ensure(
+        self, plugin: str, export: str, fetch_all: FetchAll, fetch_one: FetchOne
+    ) -> ResourceSnapshot:
+        """Returns an up-to-date snapshot, rebuilding it or refreshing stale entities."""
+        key = (plugin, export)
+        async with self._lock(key):
+            snapshot = self._fresh(key)
+            if snapshot:
+                self.hits += 1
+                await snapshot.refresh_stale(fetch_one)
+            else:
+                self.misses += 1
+                snapshot = ResourceSnapshot(
+                    plugin, export, await fetch_all(), self.index
+                )
+                self._snapshots[key] = snapshot
+            return snapshot
+
+    async def get_all(
+        self, plugin: str, export: str, fetch_all: FetchAll, fetch_one: FetchOne
+    ) -> list[Resource]:
+        if not self.config.enabled:
+            return await fetch_all()
+
+        snapshot = await self.ensure(plugin, export, fetch_all, fetch_one)
+        return list(snapshot.resources.values())
+
+    async def get_one(
+        self, plugin: str, export: str, id: str, fetch_one: FetchOne
+    ) -> Resource | None:
+        if not self.config.enabled:
+            return await fetch_one(id)
+
+        key = (plugin, export)
+        async with self._lock(key):
+            snapshot = self._fresh(key)
+            if snapshot and id in snapshot.resources.keys():
+                self.hits += 1
+                if id in snapshot.stale:
+                    snapshot.stale.discard(id)
+                    found = await fetch_one(id)
+                    if found:
+                        snapshot.set(found)
+                    else:
+                        snapshot.discard(id)
+                    return found
+                return snapshot.resources[id]
+
+            self.misses += 1
+            found = await fetch_one(id)
+            if snapshot and found:
+                snapshot.set(found)
+            return found
+
+    def peek(self, plugin: str, entity_id: str) -> tuple[str, Resource] | None:
+        """Returns the cached (export, resource) for an entity without counting a hit."""
+        for (snapshot_plugin, export), snapshot in self._snapshots.items():
+            if snapshot_plugin == plugin and entity_id in snapshot.resources.keys():
+                return export, snapshot.resources[entity_id]
+        return self._recent.get((plugin, entity_id), None)
+
+    def put(self, plugin: str, export: str, resource: Resource) -> None:
+        snapshot = self._snapshots.get((plugin, export), None)
+        if snapshot:
+            snapshot.set(resource)
+            snapshot.stale.discard(resource.id)
+            self._recent.pop((plugin, resource.id), None)
+        elif self.config.recent_size > 0:
+            self._recent[(plugin, resource.id)] = (export, resource)
+            self._recent.move_to_end((plugin, resource.id))
+            while len(self._recent) > self.config.recent_size:
+                self._recent.popitem(last=False)
+
+    def remove(self, plugin: str, entity_id: str) -> None:
+        self._recent.pop((plugin, entity_id), None)
+        for (snapshot_plugin, _), snapshot in self._snapshots.items():
+            if snapshot_plugin == plugin:
+                snapshot.discard(entity_id)
+                snapshot.stale.discard(entity_id)
+
+    def mark_stale(self, plugin: str, entity_id: str) -> None:
+        """Flags an entity, known or not, for re-resolution on the next read."""
+        for (snapshot_plugin, _), snapshot in self._snapshots.items():
+            if snapshot_plugin == plugin:
+                snapshot.stale.add(entity_id)
+
+    def invalidate(self, plugin: str | None = None) -> None:
+        for key in list(self._snapshots.keys()):
+            if plugin == None or key[0] == plugin:
+                del self._snapshots[key]
+                self.index.clear(*key)
+        for key in list(self._recent.keys()):
+            if plugin == None or key[0] == plugin:
+                del self._recent[key]
@@ -0,0 +1,173 @@
+from itertools import count
+from ..common.plugin import Resource, ExecutionTarget
+
+IndexKey = tuple[str, str, str]
+TargetList = list[ExecutionTarget | list[ExecutionTarget]]
+
+
+class IndexSelection:
+    """A set of index keys, or (if `negated`) every key except those in the set."""
+
+    def __init__(self, keys: set[IndexKey], negated: bool = False):
+        self.keys = keys
+        self.negated = negated
+
+
+class ResourceIndex:
+    """Secondary indexes over cached resources, keyed by (plugin, export, id)."""
+
+    def __init__(self):
+        self.resources: dict[IndexKey, Resource] = {}
+        self.by_plugin: dict[str, set[IndexKey]] = {}
+        self.by_id: dict[str, set[IndexKey]] = {}
+        self.by_category: dict[str | None, set[IndexKey]] = {}
+        self.by_tag: dict[str, set[IndexKey]] = {}
+        self._order: dict[IndexKey, int] = {}
+        self._counter = count()
+
+    def __len__(self) -> int:
+        return len(self.resources)
+
+    @staticmethod
+    def _add_key(index: dict[str, set[IndexKey]], value: str, key: IndexKey) -> None:
+        if not value in index.keys():
+            index[value] = set()
+        index[value].add(key)
+
+    @staticmethod
+    def _remove_key(index: dict[str, set[IndexKey]], value: str, key: IndexKey) -> None:
+        if value in index.keys():
+            index[value].discard(key)
+            if len(index[value]) == 0:
+                del index[value]
+
+    def add(self, plugin: str, export: str, resource: Resource) -> None:
+        key = (plugin, export, resource.id)
+        order = self._order.get(key, None)
+        self.remove(plugin, export, resource.id)
+        self.resources[key] = resource
+        self._order[key] = order if order != None else next(self._counter)
+        self._add_key(self.by_plugin, plugin, key)
+        self._add_key(self.by_id, resource.id, key)
+        self._add_key(self.by_category, resource.metadata.category, key)
+        for tag in resource.metadata.tags:
+            self._add_key(self.by_tag, tag, key)
+
+    def remove(self, plugin: str, export: str, id: str) -> None:
+        key = (plugin, export, id)
+        resource = self.resources.pop(key, None)
+        self._order.pop(key, None)
+        if resource:
+            self._remove_key(self.by_plugin, plugin, key)
+            self._remove_key(self.by_id, id, key)
+            self._remove_key(self.by_category, resource.metadata.category, key)
+            for tag in resource.metadata.tags:
+                self._remove_key(self.by_tag, tag, key)
+
+    def clear(self, plugin: str, export: str | None = None) -> None:
+        for key in list(self.by_plugin.get(plugin, set())):
+            if export == None or key[1] == export:
+                self.remove(*key)
+
+    def _lookup(self, index: dict[str, set[IndexKey]], values: str | list[str]):
+        if type(values) == str:
+            return index.get(values, set())
+        result: set[IndexKey] = set()
+        for value in values:
+            result |= index.get(value, set())
+        return result
+
+    def _tag_keys(self, tags: str | list[str | list[str]]) -> set[IndexKey] | None:
+        if type(tags) == str:
+            return self.by_tag.get(tags, set())
+
+        result: set[IndexKey] = set()
+        for option in tags:
+            if type(option) == list:
+                if len(option) == 0:
+                    return None
+                sets = sorted([self.by_tag.get(tag, set()) for tag in option], key=len)
+                result |= sets[0].intersection(*sets[1:])
+            else:
+                result |= self.by_tag.get(option, set())
+        return result
+
+    def _select_target(self, target: ExecutionTarget) -> IndexSelection:
+        constraints: list[set[IndexKey]] = []
+        if target.categories:
+            constraints.append(self._lookup(self.by_category, target.categories))
+        if target.tags:
+            tags = self._tag_keys(target.tags)
+            if tags != None:
+                constraints.append(tags)
+        if target.id:
+            constraints.append(self._lookup(self.by_id, target.id))
+
+        if len(constraints) > 0:
+            constraints.sort(key=len)
+            keys = constraints[0].intersection(*constraints[1:])
+        else:
+            keys = set(self.resources.keys())
+
+        if target.fragment:
+            keys = {
+                key
+                for key in keys
+                if target.compiled.match_fragment(self.resources[key])
+            }
+
+        return IndexSelection(keys, negated=target.exclude)
+
+    @staticmethod
+    def _all_of(selections: list[IndexSelection]) -> IndexSelection:
+        positive = sorted([i.keys for i in selections if not i.negated], key=len)
+        negative: set[IndexKey] = set().union(
+            *[i.keys for i in selections if i.negated]
+        )
+        if len(positive) == 0:
+            return IndexSelection(negative, negated=True)
+        return IndexSelection(positive[0].intersection(*positive[1:]) - negative)
+
+    @staticmethod
+    def _any_of(selections: list[IndexSelection]) -> IndexSelection:
+        positive: set[IndexKey] = set().union(
+            *[i.keys for i in selections if not i.negated]
+        )
+        negative = sorted([i.keys for i in selections if i.negated], key=len)
+        if len(negative) == 0:
+            return IndexSelection(positive)
+        return IndexSelection(
+            negative[0].intersection(*negative[1:]) - positive, negated=True
+        )
+
+    def select(
+        self, targets: TargetList, plugins: list[str] | None = None
+    ) -> list[Resource]:
+        """Resources matching `targets`, in the order they were first indexed."""
+        selection = self._all_of(
+            [
+                (
+                    self._select_target(target)
+                    if isinstance(target, ExecutionTarget)
+                    else self._any_of([self._select_target(i) for i in target])
+                )
+                for target in targets
+            ]
+        )
+
+        if selection.negated:
+            if plugins == None:
+                keys = set(self.resources.keys()) - selection.keys
+            else:
+                keys = set().union(
+                    *[self.by_plugin.get(plugin, set()) for plugin in plugins]
+                )
+                keys -= selection.keys
+        else:
+            keys = selection.keys
+            if plugins != None:
+                keys = {key for key in keys if key[0] in plugins}
+
+        return [
+            self.resources[key] for key in sorted(keys, key=self._order.__getitem__)
+        ]
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from logging import Logger
+import sys
+from time import perf_counter
+import tracemalloc
+from pydantic import BaseModel
+from ..common.models.config import StartupConfig
+
+
+class StartupPhase(BaseModel):
+    name: str
+    plugin: str | None = None
+    offset: float
+    elapsed: float
+    modules: int | None = None
+    allocated: int | None = None
+
+
+class StartupReport(BaseModel):
+    completed: datetime
+    total: float
+    phases: list[StartupPhase]
+
+
+class StartupProfiler:
+    """Records the wall time of each boot phase and of per-plugin steps in them."""
+
+    def __init__(self):
+        self.origin = perf_counter()
+        self.phases: list[StartupPhase] = []
+        self.report: StartupReport | None = None
+        self._tracing = False
+
+    def begin(self, config: StartupConfig) -> None:
+        if self.report:
+            self.origin = perf_counter()
+            self.phases = []
+            self.report = None
+        if config.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def record(
+        self, name: str, plugin: str | None, started: float, elapsed: float
+    ) -> None:
+        if self.report == None:
+            self.phases.append(
+                StartupPhase(
+                    name=name,
+                    plugin=plugin,
+                    offset=started - self.origin,
+                    elapsed=elapsed,
+                )
+            )
+
+    @contextmanager
+    def phase(self, name: str):
+        modules = len(sys.modules)
+        allocated = tracemalloc.get_traced_memory()[0] if self._tracing else None
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            if self.report == None:
+                self.phases.append(
+                    StartupPhase(
+                        name=name,
+                        offset=started - self.origin,
+                        elapsed=perf_counter() - started,
+                        modules=len(sys.modules) - modules,
+                        allocated=(
+                            tracemalloc.get_traced_memory()[0] - allocated
+                            if allocated != None
+                            else None
+                        ),
+                    )
+                )
+
+    def finish(self, logger: Logger) -> StartupReport:
+        self.report = StartupReport(
+            completed=datetime.now(UTC),
+            total=perf_counter() - self.origin,
+            phases=sorted(self.phases, key=lambda i: i.offset),
+        )
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+        logger.info(f"Startup finished in {self.report.total:.2f}s")
+        logger.info(f"Startup timeline: {self.report.model_dump_json()}")
+        return self.report
+
+
+STARTUP = StartupProfiler()
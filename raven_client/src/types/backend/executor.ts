@@ -1,3 +1,5 @@
+import { PluginCallStatus, Resource } from "./resource";
+
 export interface ArrayArgument {
     type: "array";
     name: string;
@@ -186,3 +188,34 @@ export interface ColorArgument {
     required?: boolean;
     format: "HEX" | "HEXA" | "RGB" | "RGBA" | "HSL" | "HSLA";
 }
+
+export interface ExecutorListing {
+    executors: Executor[];
+    plugins: { [key: string]: PluginCallStatus };
+}
+
+export interface ExecutionResult {
+    plugin: string;
+    executor: string;
+    target: string;
+    status: PluginCallStatus["status"] | "forbidden" | "not_found";
+    elapsed: number;
+    result: Resource | null;
+    error: string | null;
+}
+
+export type ExecutionPriority = "critical" | "normal" | "bulk";
+
+export interface ExecutionJob {
+    id: string;
+    user: string;
+    plugin: string;
+    executor: string;
+    target: string;
+    priority: ExecutionPriority;
+    status: "queued" | "running" | "done" | "failed" | "cancelled";
+    queued: string;
+    started: string | null;
+    finished: string | null;
+    result: ExecutionResult | null;
+}
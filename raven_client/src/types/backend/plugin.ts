@@ -8,6 +8,7 @@ export interface LifecycleExport extends BaseExport {
     type: "lifecycle";
     context_key: string;
     is_async: boolean;
+    kwargs: { [key: string]: string };
 }
 
 export interface ResourceExport extends BaseExport {
@@ -35,3 +35,14 @@ export type Resource = {
     properties: { [key: string]: ResourceProperty };
     state_key: string;
 };
+
+export type PluginCallStatus = {
+    status: "ok" | "timeout" | "error" | "unavailable";
+    elapsed: number;
+    errors: { [key: string]: string };
+};
+
+export type ResourceListing = {
+    resources: Resource[];
+    plugins: { [key: string]: PluginCallStatus };
+};
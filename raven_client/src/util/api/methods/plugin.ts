@@ -21,5 +21,16 @@ export function PluginMixin<TBase extends MixinConstructor>(base: TBase) {
                 null
             );
         }
+
+        public async reload_plugin(
+            name: string
+        ): Promise<PluginManifest | null> {
+            return data(
+                await this.request<PluginManifest>(`/plugins/${name}/reload`, {
+                    method: "post",
+                }),
+                null
+            );
+        }
     };
 }
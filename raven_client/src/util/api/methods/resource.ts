@@ -1,12 +1,25 @@
-import { ExecutionTarget, Executor } from "../../../types/backend/executor";
-import { Resource } from "../../../types/backend/resource";
+import {
+    ExecutionJob,
+    ExecutionPriority,
+    ExecutionTarget,
+    ExecutionResult,
+    Executor,
+    ExecutorListing,
+} from "../../../types/backend/executor";
+import {
+    Resource,
+    ResourceListing,
+} from "../../../types/backend/resource";
 import { data } from "../types";
 import { MixinConstructor } from "./base";
 
 export function ResourceMixin<TBase extends MixinConstructor>(base: TBase) {
     return class ResourceMethods extends base {
         public async list_resources(): Promise<Resource[]> {
-            return data(await this.request<Resource[]>("/resources"), []);
+            return (
+                data(await this.request<ResourceListing>("/resources"), null)
+                    ?.resources ?? []
+            );
         }
 
         public async get_resource(
@@ -24,24 +37,28 @@ export function ResourceMixin<TBase extends MixinConstructor>(base: TBase) {
         public async get_executors_for_resource(
             ...resources: Resource[]
         ): Promise<Executor[]> {
-            return data(
-                await this.request<Executor[]>("/resources/executors", {
-                    method: "post",
-                    body: resources,
-                }),
-                [],
+            return (
+                data(
+                    await this.request<ExecutorListing>("/resources/executors", {
+                        method: "post",
+                        body: resources,
+                    }),
+                    null,
+                )?.executors ?? []
             );
         }
 
         public async get_resources_by_target(
             targets: (ExecutionTarget | ExecutionTarget[])[],
         ): Promise<Resource[]> {
-            return data(
-                await this.request<Resource[]>("/resources/filtered", {
-                    method: "post",
-                    body: targets,
-                }),
-                [],
+            return (
+                data(
+                    await this.request<ResourceListing>("/resources/filtered", {
+                        method: "post",
+                        body: targets,
+                    }),
+                    null,
+                )?.resources ?? []
             );
         }
 
@@ -55,5 +72,44 @@ export function ResourceMixin<TBase extends MixinConstructor>(base: TBase) {
                 body: { target, executor, args },
             });
         }
+
+        public async queue_execution(
+            executor: Executor,
+            args: { [key: string]: any },
+            target: Resource,
+            priority: ExecutionPriority = "normal",
+        ): Promise<ExecutionJob | null> {
+            return data(
+                await this.request<ExecutionJob>("/resources/execute", {
+                    method: "post",
+                    body: { target, executor, args, queue: true, priority },
+                }),
+                null,
+            );
+        }
+
+        public async get_execution_job(id: string): Promise<ExecutionJob | null> {
+            return data(
+                await this.request<ExecutionJob>(`/resources/jobs/${id}`),
+                null,
+            );
+        }
+
+        public async execute_bulk(
+            executor: Executor,
+            args: { [key: string]: any },
+            targets: Resource[],
+        ): Promise<ExecutionResult[]> {
+            return data(
+                await this.request<ExecutionResult[]>(
+                    "/resources/execute/bulk",
+                    {
+                        method: "post",
+                        body: { executor, args, targets },
+                    },
+                ),
+                [],
+            );
+        }
     };
 }
@@ -2,17 +2,24 @@ import { ReactNode, useEffect, useMemo } from "react";
 import { useApi } from "../api";
 import { Event, EventContext } from "./types";
 import { isArray, omit, uniqueId } from "lodash";
+import { decode, encode } from "@msgpack/msgpack";
+
+// Events and commands are exchanged as msgpack binary frames, which are smaller
+// and cheaper to decode than JSON text.
+const ENCODING: "json" | "msgpack" = "msgpack";
 
 class EventManager {
     public subscriptions: {
         [key: string]: { id: string; callback: (event: Event) => void }[];
     };
     private socket: WebSocket | null;
+    private lastId: string | null;
     public active: boolean;
 
     public constructor() {
         this.subscriptions = {};
         this.socket = null;
+        this.lastId = null;
         this.active = false;
     }
 
@@ -24,8 +31,20 @@ class EventManager {
         return this.socket.readyState === WebSocket.OPEN;
     }
 
+    private send(command: { command: string; paths: string[] }) {
+        this.socket?.send(
+            ENCODING === "msgpack" ? encode(command) : JSON.stringify(command),
+        );
+    }
+
     public handleEvent(event: MessageEvent) {
-        const parsed: Event = JSON.parse(event.data);
+        const parsed: Event =
+            event.data instanceof ArrayBuffer
+                ? (decode(new Uint8Array(event.data)) as Event)
+                : JSON.parse(event.data);
+        if (parsed.type !== "events.resync") {
+            this.lastId = parsed.id;
+        }
         if (parsed.subscribers) {
             for (const sub of parsed.subscribers) {
                 if (Object.keys(this.subscriptions).includes(sub)) {
@@ -41,17 +60,22 @@ class EventManager {
         }
 
         this.active = true;
-        this.socket = new WebSocket(`wss://${location.host}/api/events/ws`);
+        const params = new URLSearchParams({ encoding: ENCODING });
+        if (this.lastId) {
+            params.set("last_id", this.lastId);
+        }
+        this.socket = new WebSocket(
+            `wss://${location.host}/api/events/ws?${params.toString()}`,
+        );
+        this.socket.binaryType = "arraybuffer";
         this.socket.addEventListener("message", this.handleEvent.bind(this));
         this.socket.addEventListener(
             "open",
             (() =>
-                this.socket?.send(
-                    JSON.stringify({
-                        command: "subscriptions.add",
-                        paths: Object.keys(this.subscriptions),
-                    }),
-                )).bind(this),
+                this.send({
+                    command: "subscriptions.add",
+                    paths: Object.keys(this.subscriptions),
+                })).bind(this),
         );
         this.socket.addEventListener(
             "close",
@@ -65,6 +89,7 @@ class EventManager {
 
     public disconnect() {
         this.active = false;
+        this.lastId = null;
         if (this.connected) {
             this.socket?.close();
         }
@@ -82,12 +107,10 @@ class EventManager {
         const id = uniqueId();
         this.subscriptions[channel].push({ id, callback });
         if (this.connected) {
-            this.socket?.send(
-                JSON.stringify({
-                    command: "subscriptions.add",
-                    paths: [channel],
-                }),
-            );
+            this.send({
+                command: "subscriptions.add",
+                paths: [channel],
+            });
         }
         return id;
     }
@@ -107,12 +130,10 @@ class EventManager {
         }
 
         if (this.connected && unsubscribeFrom.length > 0) {
-            this.socket?.send(
-                JSON.stringify({
-                    command: "subscriptions.remove",
-                    paths: unsubscribeFrom,
-                }),
-            );
+            this.send({
+                command: "subscriptions.remove",
+                paths: unsubscribeFrom,
+            });
         }
     }
 }
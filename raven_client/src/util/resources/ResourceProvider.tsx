@@ -2,9 +2,21 @@ import { ReactNode, useCallback, useEffect } from "react";
 import { ResourceMixin, useApi, useScoped } from "../api";
 import { ResourceContext } from "./types";
 import { useListState } from "@mantine/hooks";
-import { Resource } from "../../types/backend/resource";
+import {
+    Resource,
+    ResourceMetadata,
+    ResourceProperty,
+} from "../../types/backend/resource";
 import { Event, useEvent } from "../events";
 
+type ResourceUpdate = {
+    entity_id: string;
+    changes: { [key: string]: ResourceProperty | null } | null;
+    metadata: ResourceMetadata | null;
+    state_key: string | null;
+    deleted: boolean;
+};
+
 function AuthenticatedResourceProvider({
     children,
 }: {
@@ -13,7 +25,7 @@ function AuthenticatedResourceProvider({
     const api = useApi(ResourceMixin);
     const [resources, resourceMethods] = useListState<Resource>([]);
 
-    useEffect(() => {
+    const reload = useCallback(() => {
         if (api.state === "ready" && api.auth?.user) {
             api.methods.list_resources().then((values) => {
                 resourceMethods.setState(values);
@@ -23,27 +35,47 @@ function AuthenticatedResourceProvider({
         }
     }, [api.auth?.user?.id, api.state]);
 
+    useEffect(reload, [reload]);
+
     const onUpdate = useCallback(
-        (event: Event<{ entity_id: string }>) => {
-            if (event.plugin) {
+        (event: Event<ResourceUpdate>) => {
+            if (!event.plugin) {
+                return;
+            }
+            const matches = (item: Resource) =>
+                item.id === event.data.entity_id &&
+                item.plugin === event.plugin;
+
+            if (event.data.deleted) {
+                resourceMethods.filter((item) => !matches(item));
+            } else if (event.data.changes) {
+                const changes = event.data.changes;
+                resourceMethods.applyWhere(matches, (item) => ({
+                    ...item,
+                    metadata: event.data.metadata ?? item.metadata,
+                    state_key: event.data.state_key ?? item.state_key,
+                    properties: Object.fromEntries(
+                        Object.entries({
+                            ...item.properties,
+                            ...changes,
+                        }).filter(([_, value]) => value !== null),
+                    ) as Resource["properties"],
+                }));
+            } else {
                 api.methods
                     .get_resource(event.plugin, event.data.entity_id)
                     .then((result) => {
                         if (result) {
-                            resourceMethods.applyWhere(
-                                (item) =>
-                                    item.id === event.data.entity_id &&
-                                    item.plugin === event.plugin,
-                                () => result,
-                            );
+                            resourceMethods.applyWhere(matches, () => result);
                         }
                     });
             }
         },
-        [resourceMethods.applyWhere],
+        [resourceMethods.applyWhere, resourceMethods.filter],
     );
 
     useEvent("resource.update", onUpdate);
+    useEvent("events.resync", reload);
 
     return (
         <ResourceContext.Provider value={resources}>
@@ -313,6 +313,7 @@ export function PipelineIOTab() {
     useEffect(getEntries, [getEntries]);
     useEvent("pipeline.io.edit", getEntries);
     useEvent("pipeline.io.activate", getEntries);
+    useEvent("events.resync", getEntries);
 
     return (
         <Stack gap="sm" className="io-stack">
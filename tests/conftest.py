@@ -0,0 +1,165 @@
+import os
+import sys
+import tempfile
+
+# raven_api reads ./config.toml and lists ./plugins on import, so the tests run from
+# a scratch directory holding a minimal config and no plugins.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="raven-tests-")
+os.makedirs(os.path.join(WORKDIR, "plugins"))
+with open(os.path.join(WORKDIR, "config.toml"), "w") as config_file:
+    config_file.write(
+        '[storage.mongo]\nurl = "mongodb://localhost:27017"\ndatabase = "raven_tests"\n'
+        '[storage.redis]\nurl = "redis://localhost:6379"\n'
+    )
+os.chdir(WORKDIR)
+
+# Only importable once the scratch directory is in place
+import random
+import pytest
+from raven_api.common.plugin import (
+    ExecutionTarget,
+    Executor,
+    Resource,
+    ResourceMetadata,
+    ResourceProperty,
+)
+from raven_api.common.plugin.models.executor import match_fragment
+
+
+def interpreted_matches(target: ExecutionTarget, resource: Resource) -> bool:
+    # ExecutionTarget.matches as it was before targets were compiled
+    resource_dict = resource.model_dump()
+    result = True
+    if target.categories:
+        if resource.metadata.category == None:
+            result = False
+        elif type(target.categories) == str:
+            result = target.categories == resource.metadata.category
+        else:
+            result = resource.metadata.category in target.categories
+    if result and target.tags:
+        if type(target.tags) == str:
+            result = target.tags in resource.metadata.tags
+        else:
+            result = any(
+                [
+                    (
+                        all([j in resource.metadata.tags for j in i])
+                        if type(i) == list
+                        else i in resource.metadata.tags
+                    )
+                    for i in target.tags
+                ]
+            )
+    if result and target.id:
+        if type(target.id) == str:
+            result = target.id == resource.id
+        else:
+            result = resource.id in target.id
+    if result and target.fragment:
+        result = match_fragment(target.fragment, resource_dict)
+    return not result if target.exclude else result
+
+
+@pytest.fixture
+def interpreted_targets():
+    def matches(targets, resource: Resource) -> bool:
+        return all(
+            [
+                (
+                    interpreted_matches(target, resource)
+                    if isinstance(target, ExecutionTarget)
+                    else any([interpreted_matches(i, resource) for i in target])
+                )
+                for target in targets
+            ]
+        )
+
+    return matches
+
+
+CATEGORIES = ["light", "switch", "sensor"]
+TAGS = ["kitchen", "hall", "dimmable", "color"]
+IDS = [f"light.{i}" for i in range(6)]
+FRAGMENTS = [
+    {"plugin": "test"},
+    {"plugin": "other"},
+    {"id": "light.0"},
+    {"metadata": {"display_name": None, "icon": None, "category": "light", "tags": []}},
+    {"properties": {}},
+    {"unknown": 1},
+]
+
+
+def make_resource(rng: random.Random) -> Resource:
+    return Resource(
+        id=rng.choice(IDS),
+        plugin=rng.choice(["test", "other"]),
+        state_key="state",
+        metadata=ResourceMetadata(
+            category=rng.choice(CATEGORIES + [None]),
+            tags=rng.sample(TAGS, rng.randint(0, 3)),
+        ),
+        properties=rng.choice(
+            [{}, {"state": ResourceProperty(type="text", value="on")}]
+        ),
+    )
+
+
+def pick(rng: random.Random, values: list[str]) -> str | list[str]:
+    return rng.choice([rng.choice(values), rng.sample(values, rng.randint(0, 2))])
+
+
+def make_target(rng: random.Random) -> ExecutionTarget:
+    target = {"exclude": rng.random() < 0.2}
+    if rng.random() < 0.5:
+        target["categories"] = pick(rng, CATEGORIES)
+    if rng.random() < 0.5:
+        target["tags"] = rng.choice(
+            [
+                rng.choice(TAGS),
+                [pick(rng, TAGS) for _ in range(rng.randint(0, 3))],
+            ]
+        )
+    if rng.random() < 0.3:
+        target["id"] = pick(rng, IDS)
+    if rng.random() < 0.2:
+        target["fragment"] = rng.choice(FRAGMENTS)
+    return ExecutionTarget(**target)
+
+
+def make_targets(rng: random.Random) -> list[ExecutionTarget | list[ExecutionTarget]]:
+    return [
+        (
+            make_target(rng)
+            if rng.random() < 0.6
+            else [make_target(rng) for _ in range(rng.randint(0, 3))]
+        )
+        for _ in range(rng.randint(0, 3))
+    ]
+
+
+@pytest.fixture
+def random_resource():
+    return make_resource
+
+
+@pytest.fixture
+def random_targets():
+    return make_targets
+
+
+@pytest.fixture
+def resource():
+    def make(id: str) -> Resource:
+        return Resource(id=id, plugin="test", state_key=id, properties={})
+
+    return make
+
+
+@pytest.fixture
+def executor() -> Executor:
+    return Executor(id="toggle", plugin="test", export="exe", name="Toggle")
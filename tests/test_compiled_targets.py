@@ -0,0 +1,15 @@
+import random
+from raven_api.common.plugin.models.executor import CompiledTargets
+
+
+def test_matches_interpreted_targets(
+    random_resource, random_targets, interpreted_targets
+):
+    rng = random.Random(0)
+    resources = [random_resource(rng) for _ in range(40)]
+    for _ in range(500):
+        targets = random_targets(rng)
+        compiled = CompiledTargets(targets)
+        for resource in resources:
+            expected = interpreted_targets(targets, resource)
+            assert compiled.matches(resource) == expected, (targets, resource)
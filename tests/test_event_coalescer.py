@@ -0,0 +1,40 @@
+import asyncio
+from raven_api.common.plugin import EVENTS, ResourceUpdateEvent
+from raven_api.common.plugin.models.event import PipelineIOUpdateEvent
+from raven_api.util.event_coalescer import EventCoalescer
+
+
+class FakeApp:
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, listener, event, app):
+        self.emitted.append(event)
+
+
+def update(entity_id: str) -> ResourceUpdateEvent:
+    return ResourceUpdateEvent(source="test", entity_id=entity_id)
+
+
+def test_only_coalesced_paths_are_held():
+    async def run():
+        app = FakeApp()
+        async with EventCoalescer(window=10, paths=["resource.update"]).run() as c:
+            c.submit(app, "core", update("a"))
+            c.submit(app, "core", update("a"))
+            c.submit(app, "core", PipelineIOUpdateEvent(source="test"))
+            assert [i.path for i in app.emitted] == ["pipeline.io.edit"]
+            assert c.stats["merged"] == 1
+
+        assert [i.path for i in app.emitted] == ["pipeline.io.edit", "resource.update"]
+
+    asyncio.run(run())
+
+
+def test_registry_is_reset_on_shutdown():
+    async def run():
+        async with EventCoalescer(window=10).run() as coalescer:
+            assert EVENTS.coalescer is coalescer
+        assert EVENTS.coalescer == None
+
+    asyncio.run(run())
@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from raven_api.common.models.config import ExecutionQueueConfig
+from raven_api.util.execution_queue import ExecutionQueueFull, ExecutionScheduler
+from raven_api.util.plugin_calls import ExecutionResult
+
+
+class FakeLoader:
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started: list[str] = []
+
+    async def execute(self, executor, arguments, target) -> ExecutionResult:
+        self.started.append(target.id)
+        if target.id == "broken":
+            raise RuntimeError("executor crashed")
+        if target.id.startswith("slow"):
+            await self.release.wait()
+        return ExecutionResult(
+            plugin=executor.plugin, executor=executor.id, target=target.id
+        )
+
+
+def test_failed_execution_marks_job_failed(resource, executor):
+    async def run():
+        scheduler = ExecutionScheduler(FakeLoader(), ExecutionQueueConfig())
+        async with scheduler.run(None):
+            job = await scheduler.submit("user", executor, {}, resource("broken"))
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+            assert job.status == "failed"
+            assert job.finished != None
+            assert job.result.status == "error"
+            assert job.result.error == "Execution failed"
+            assert scheduler.stats["test"]["failed"] == 1
+
+    asyncio.run(run())
+
+
+def test_critical_jobs_do_not_wait_behind_bulk_jobs(resource, executor):
+    async def run():
+        loader = FakeLoader()
+        scheduler = ExecutionScheduler(
+            loader, ExecutionQueueConfig(workers=1, critical_workers=1)
+        )
+        async with scheduler.run(None):
+            await scheduler.submit("user", executor, {}, resource("slow.0"), "bulk")
+            await scheduler.submit("user", executor, {}, resource("slow.1"), "bulk")
+            for _ in range(10):
+                await asyncio.sleep(0)
+            critical = await scheduler.submit(
+                "user", executor, {}, resource("urgent"), "critical"
+            )
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+            assert critical.status == "done"
+            assert loader.started == ["slow.0", "urgent"]
+            loader.release.set()
+
+    asyncio.run(run())
+
+
+def test_shutdown_cancels_queued_jobs(resource, executor):
+    async def run():
+        scheduler = ExecutionScheduler(
+            FakeLoader(), ExecutionQueueConfig(workers=1, critical_workers=0)
+        )
+        async with scheduler.run(None):
+            running = await scheduler.submit("user", executor, {}, resource("slow"))
+            queued = await scheduler.submit("user", executor, {}, resource("next"))
+            await asyncio.sleep(0)
+
+        assert running.status == "cancelled"
+        assert queued.status == "cancelled"
+        assert queued.result.error == "Cancelled"
+
+    asyncio.run(run())
+
+
+def test_full_bulk_queue_still_accepts_critical_jobs(resource, executor):
+    async def run():
+        loader = FakeLoader()
+        scheduler = ExecutionScheduler(
+            loader, ExecutionQueueConfig(workers=1, critical_workers=0, max_depth=1)
+        )
+        async with scheduler.run(None):
+            await scheduler.submit("user", executor, {}, resource("slow.0"), "bulk")
+            await asyncio.sleep(0)
+            await scheduler.submit("user", executor, {}, resource("slow.1"), "bulk")
+            with pytest.raises(ExecutionQueueFull):
+                await scheduler.submit("user", executor, {}, resource("slow.2"), "bulk")
+
+            critical = await scheduler.submit(
+                "user", executor, {}, resource("urgent"), "critical"
+            )
+            assert critical.status == "queued"
+            loader.release.set()
+
+    asyncio.run(run())
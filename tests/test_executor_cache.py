@@ -0,0 +1,77 @@
+import asyncio
+from raven_api.common.models.config import ExecutorCacheConfig
+from raven_api.util.executor_cache import ExecutorCache
+
+
+def test_cancelled_leader_does_not_cancel_waiters(resource, executor):
+    async def run():
+        cache = ExecutorCache(ExecutorCacheConfig())
+        release = asyncio.Event()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return [executor], True
+
+        leader = asyncio.create_task(cache.get("test", [resource("a")], fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get("test", [resource("a")], fetch))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await waiter == [executor]
+        assert leader.cancelled()
+        assert len(calls) == 1
+        assert await cache.get("test", [resource("a")], fetch) == [executor]
+        assert len(calls) == 1
+
+    asyncio.run(run())
+
+
+def test_invalidation_during_fetch_is_not_cached(resource, executor):
+    async def run():
+        cache = ExecutorCache(ExecutorCacheConfig())
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return [executor], True
+
+        task = asyncio.create_task(cache.get("test", [resource("a")], fetch))
+        await asyncio.sleep(0)
+        cache.touch("a")
+        release.set()
+        await task
+        assert cache.stats["entries"] == 0
+
+    asyncio.run(run())
+
+
+def test_versions_are_dropped_with_their_entries(resource, executor):
+    async def run():
+        cache = ExecutorCache(ExecutorCacheConfig(max_entries=2))
+
+        async def fetch():
+            return [executor], True
+
+        for i in range(50):
+            await cache.get("test", [resource(f"r{i}")], fetch)
+            cache.touch(f"r{i}")
+            cache.touch(f"unrelated{i}")
+            cache.invalidate(f"plugin{i}")
+
+        assert cache.stats["entries"] == 2
+        assert len(cache._versions) <= 2
+        assert len(cache._entity_refs) == 2
+        assert set(cache._generations.keys()) <= {"test"}
+
+        cache.invalidate()
+        assert cache._versions == {}
+        assert cache._entity_refs == {}
+        assert cache._generations == {}
+
+    asyncio.run(run())
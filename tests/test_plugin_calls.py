@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from raven_api.common.models.config import (
+    ExecutorCacheConfig,
+    PluginCallsConfig,
+    ResourceCacheConfig,
+)
+from raven_api.common.plugin import (
+    ExecutionManager,
+    Executor,
+    PluginManifest,
+    Resource,
+    ResourceResolver,
+)
+from raven_api.util.executor_cache import ExecutorCache
+from raven_api.util.plugin import Plugin
+from raven_api.util.plugin_calls import (
+    CallStatus,
+    CircuitOpenError,
+    ExportGuard,
+    PluginCalls,
+)
+from raven_api.util.resource_cache import ResourceCache
+
+
+async def open_guard() -> ExportGuard:
+    guard = ExportGuard(timeout=0.01, max_concurrent=None, threshold=1, cooldown=0.05)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    with pytest.raises(TimeoutError):
+        await guard.call(hang)
+    assert guard.state == "open"
+    return guard
+
+
+def test_half_open_lets_exactly_one_probe_through():
+    async def run():
+        guard = await open_guard()
+        await asyncio.sleep(0.06)
+        assert guard.state == "half_open"
+
+        release = asyncio.Event()
+        calls = []
+
+        async def probe():
+            calls.append(1)
+            await release.wait()
+            return "ok"
+
+        guard.timeout = None
+        first = asyncio.create_task(guard.call(probe))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await asyncio.wait_for(guard.call(probe), 1)
+
+        release.set()
+        assert await first == "ok"
+        assert len(calls) == 1
+        assert guard.state == "closed"
+        assert await guard.call(probe) == "ok"
+
+    asyncio.run(run())
+
+
+def test_failed_probe_reopens_the_breaker():
+    async def run():
+        guard = await open_guard()
+        await asyncio.sleep(0.06)
+
+        async def broken():
+            raise RuntimeError("still down")
+
+        with pytest.raises(RuntimeError):
+            await guard.call(broken)
+        assert guard.state == "open"
+        with pytest.raises(CircuitOpenError):
+            await guard.call(broken)
+
+    asyncio.run(run())
+
+
+class BrokenResolver(ResourceResolver):
+    def __init__(self, **kwargs):
+        raise ConnectionError("upstream down")
+
+
+class WorkingResolver(ResourceResolver):
+    async def get_all(self):
+        return [Resource(id="a", plugin="test", state_key="a", properties={})]
+
+
+class BrokenManager(ExecutionManager):
+    def __init__(self, export: str, **kwargs):
+        raise ConnectionError("upstream down")
+
+
+class WorkingManager(ExecutionManager):
+    async def get_executors(self, targets):
+        return [Executor(id="toggle", plugin="test", export=self.export, name="Toggle")]
+
+
+def make_plugin() -> Plugin:
+    module = SimpleNamespace(
+        BrokenResolver=BrokenResolver,
+        WorkingResolver=WorkingResolver,
+        BrokenManager=BrokenManager,
+        WorkingManager=WorkingManager,
+    )
+    manifest = PluginManifest(
+        slug="test",
+        name="Test",
+        entrypoint="test",
+        exports={
+            "broken": {"type": "resource", "member": "BrokenResolver"},
+            "working": {"type": "resource", "member": "WorkingResolver"},
+            "broken_exe": {"type": "executor", "member": "BrokenManager"},
+            "working_exe": {"type": "executor", "member": "WorkingManager"},
+        },
+    )
+    loader = SimpleNamespace(
+        calls=PluginCalls(PluginCallsConfig()),
+        resource_cache=ResourceCache(ResourceCacheConfig()),
+        executor_cache=ExecutorCache(ExecutorCacheConfig()),
+        lifecycle=None,
+    )
+    return Plugin(
+        {
+            "folder": "",
+            "manifest": manifest,
+            "module": SimpleNamespace(get=lambda: module),
+        },
+        loader,
+    )
+
+
+def test_failing_constructors_are_recorded_per_export():
+    async def run():
+        plugin = make_plugin()
+
+        status = CallStatus()
+        resources = await plugin.get_resources(status)
+        assert [i.id for i in resources] == ["a"]
+        assert status.status == "error"
+        assert list(status.errors.keys()) == ["broken"]
+
+        status = CallStatus()
+        executors = await plugin.get_executors_for_resources(resources, status)
+        assert [i.export for i in executors] == ["working_exe"]
+        assert list(status.errors.keys()) == ["broken_exe"]
+
+    asyncio.run(run())
@@ -0,0 +1,39 @@
+import random
+from raven_api.util.resource_index import ResourceIndex
+
+
+def test_select_matches_scanning_every_resource(
+    random_resource, random_targets, interpreted_targets
+):
+    rng = random.Random(0)
+    index = ResourceIndex()
+    scanned = {}
+    for _ in range(200):
+        operation = rng.random()
+        if operation < 0.7:
+            resource = random_resource(rng)
+            key = (resource.plugin, rng.choice(["a", "b"]), resource.id)
+            index.add(*key[:2], resource)
+            scanned[key] = resource
+        elif operation < 0.95 and len(scanned) > 0:
+            key = rng.choice(list(scanned.keys()))
+            index.remove(*key)
+            del scanned[key]
+        else:
+            plugin, export = rng.choice(["test", "other"]), rng.choice(["a", None])
+            index.clear(plugin, export)
+            for key in list(scanned.keys()):
+                if key[0] == plugin and export in [None, key[1]]:
+                    del scanned[key]
+
+        assert len(index) == len(scanned)
+        for _ in range(10):
+            targets = random_targets(rng)
+            plugins = rng.choice([None, ["test"], ["other"], ["test", "other"], []])
+            expected = [
+                resource
+                for key, resource in scanned.items()
+                if (plugins == None or key[0] in plugins)
+                and interpreted_targets(targets, resource)
+            ]
+            assert index.select(targets, plugins) == expected, (targets, plugins)
@@ -0,0 +1,24 @@
+import asyncio
+from logging import getLogger
+from raven_api import CONFIG
+from raven_api.common.plugin import ResourceUpdateEvent
+from raven_api.util.plugin import PluginLoader
+
+
+def test_unresolved_update_is_still_published():
+    async def run():
+        loader = PluginLoader(CONFIG, getLogger("test"))
+
+        async def resolve_update(event):
+            raise ConnectionError("upstream down")
+
+        loader.resolve_update = resolve_update
+        published = []
+        event = ResourceUpdateEvent(source="test", entity_id="a")
+        loader.schedule_update(event, published.append)
+        await asyncio.gather(*loader._update_tasks)
+
+        assert published == [event]
+        assert published[0].changes == None
+
+    asyncio.run(run())
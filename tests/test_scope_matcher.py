@@ -0,0 +1,24 @@
+import random
+from raven_api.common.models.auth import glob_match
+from raven_api.common.models.scope_matcher import ScopeMatcher, compile_scopes
+
+
+def random_scope(rng: random.Random, alphabet: list[str]) -> str:
+    return ".".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+
+
+def test_matches_glob_match():
+    rng = random.Random(0)
+    for _ in range(300):
+        scopes = [random_scope(rng, ["a", "b", "c"]) for _ in range(rng.randint(0, 12))]
+        matcher = ScopeMatcher(scopes)
+        for _ in range(20):
+            check = random_scope(rng, ["a", "b", "c", "*"])
+            assert matcher.match(check) == glob_match(check, scopes), (check, scopes)
+            assert matcher.matches(check) == bool(glob_match(check, scopes))
+
+
+def test_compiled_matcher_follows_scope_changes():
+    first = compile_scopes("test", ["resources.all.view"])
+    assert compile_scopes("test", ["resources.all.view"]) is first
+    assert not compile_scopes("test", ["pipelines.view"]).matches("resources.*")